@@ -0,0 +1,99 @@
+"""
+Per-iteration benchmark of the clock's main loop, run headless under
+CPython in the simulator (see simulator/). The clock runs twice from the
+same start: once for host time per iteration, once with tracemalloc on for
+bytes allocated per iteration (tracing slows things down too much to time
+the same run). Prints boot time and the median, 95th percentile, max and
+mean of each, plus refreshes, syncs and collections. Fails (exit status 1)
+if garbage is collected more than --max-gc times per iteration, as when
+something forces a collection every time around the loop.
+
+    python3 benchClock.py [--iterations 1440] [--start 2021-01-04T06:00]
+        [--utc-offset -5] [--render] [--set NAME=VALUE ...]
+        [--snapshot frame.ppm] [--max-gc 0.05]
+
+Host times are only comparable between runs on the same computer, and
+CPython allocates far more than the board; use them to compare changes.
+"""
+
+import argparse
+import ast
+import calendar
+import sys
+import time
+import tracemalloc
+from simulator import Simulator
+
+
+def summary(values):
+    """ (median, 95th percentile, max, mean) of values. """
+    values = sorted(values)
+    return (values[len(values) // 2], values[len(values) * 95 // 100],
+            values[-1], sum(values) / len(values))
+
+
+def simulate(args, settings, trace):
+    start = calendar.timegm(time.strptime(args.start, '%Y-%m-%dT%H:%M'))
+    sim = Simulator(start=start - args.utc_offset * 3600,
+                    utc_offset=args.utc_offset, settings=settings,
+                    render=args.render or bool(args.snapshot))
+    if trace:
+        tracemalloc.start()
+    try:
+        sim.run(iterations=args.iterations)
+    finally:
+        if trace:
+            tracemalloc.stop()
+    return sim
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--iterations', type=int, default=1440,
+                        help='main loop iterations to run (default 1440)')
+    parser.add_argument('--start', default='2021-01-04T06:00',
+                        help='local time to start at (default a Monday)')
+    parser.add_argument('--utc-offset', type=float, default=0,
+                        help='timezone offset from UTC in hours')
+    parser.add_argument('--render', action='store_true',
+                        help='paint every refresh into the framebuffer')
+    parser.add_argument('--set', action='append', default=[],
+                        metavar='NAME=VALUE',
+                        help='change a setting in code.py, e.g. DEMO=True')
+    parser.add_argument('--snapshot', help='save the last frame as a PPM')
+    parser.add_argument('--max-gc', type=float, default=0.05,
+                        help='collections per iteration that fail the '
+                        'bench (default 0.05)')
+    args = parser.parse_args()
+    settings = {}
+    for setting in args.set:
+        name, _, value = setting.partition('=')
+        settings[name] = ast.literal_eval(value)
+
+    sim = simulate(args, settings, False)
+    traced = simulate(args, settings, True)
+    if args.snapshot:
+        sim.display.save_ppm(args.snapshot)
+
+    days = sim.clock.monotonic_ns() / 86400e9
+    print('%d iterations over %.2f simulated days, boot %.1f ms' %
+          (sim.iteration, days, sim.boot_ns / 1e6))
+    print('%-16s %9s %9s %9s %9s' % ('per iteration', 'median', 'p95', 'max',
+                                     'mean'))
+    print('%-16s %9.1f %9.1f %9.1f %9.1f' % (
+        ('host us',) + tuple(ns / 1000 for ns in summary(sim.iteration_ns))))
+    print('%-16s %9d %9d %9d %9.1f' % (('bytes',) +
+                                       summary(traced.iteration_bytes)))
+    renderer = sim.namespace['RENDERER']
+    print('refreshes %d, skipped %d, syncs %d (%d failed), gc %d' % (
+        renderer.refreshes, renderer.skipped, sim.server.requests,
+        sim.server.failures, sim.heap.collections))
+    per_iteration = sim.heap.collections / max(sim.iteration, 1)
+    if per_iteration > args.max_gc:
+        print('FAIL: %.3f collections per iteration, more than %g' %
+              (per_iteration, args.max_gc))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Font loading benchmark for the Matrix Portal: time and resident memory of
+each font loaded from its BDF file (plus load_glyphs() of the same
+characters) against its packed .gfa version from fontpack.py. Copy this to
+code.py with the garbage_clock package in /lib and both versions of each
+font in /fonts, and watch the serial console.
+"""
+
+# pylint: disable=import-error
+import gc
+import time
+from adafruit_bitmap_font import bitmap_font
+from garbage_clock.packed_font import PackedFont
+
+FONTS = ('helvB12', 'helvR10')
+
+
+def measure(load):
+    """ Return (milliseconds, resident bytes, font) for load(). """
+    gc.collect()
+    free = gc.mem_free()
+    start = time.monotonic_ns()
+    font = load()
+    elapsed = (time.monotonic_ns() - start) // 1000000
+    gc.collect()
+    return elapsed, free - gc.mem_free(), font
+
+
+def load_bdf(path, chars):
+    """ The clock's old way: parse the BDF, then preload its glyphs. """
+    font = bitmap_font.load_font(path)
+    font.load_glyphs(chars)
+    return font
+
+
+for name in FONTS:
+    packed_ms, packed_bytes, packed = measure(
+        lambda: PackedFont('/fonts/' + name + '.gfa'))
+    chars = ''.join([chr(c) for c in packed.glyphs])
+    del packed
+    bdf_ms, bdf_bytes, bdf = measure(
+        lambda: load_bdf('/fonts/' + name + '.bdf', chars))
+    del bdf
+    print(name, len(chars), "glyphs")
+    print("  BDF:    ", bdf_ms, "ms,", bdf_bytes, "bytes resident")
+    print("  packed: ", packed_ms, "ms,", packed_bytes, "bytes resident")
@@ -0,0 +1,85 @@
+"""
+Import cost audit for the Matrix Portal: heap and time taken by each module
+the clock imports, in the order code.py imports them. Copy this to code.py
+(with the clock's libraries in /lib as usual) and watch the serial console.
+Each import is measured once, in a freshly started interpreter, so a module
+pulled in by an earlier one shows up as almost free and its cost is counted
+with the first. 'allocated' is everything the import allocated, including
+what compiling .py source throws away (close to the peak it needs); 'kept'
+is what is still in use after a garbage collection.
+
+Compare the garbage_clock rows with the package as .py files and as .mpy
+files from mpybuild.py to see what precompiling saves.
+"""
+
+# pylint: disable=import-error
+import gc
+import time
+
+MODULES = (
+    'math',
+    'board',
+    'busio',
+    'displayio',
+    'microcontroller',
+    'supervisor',
+    'micropython',
+    'rtc',
+    'adafruit_matrixportal.network',
+    'adafruit_matrixportal.matrix',
+    'adafruit_display_text.label',
+    'adafruit_lis3dh',
+    'adafruit_requests',
+    'garbage_clock.aio_time',
+    'garbage_clock.fonts',
+    'garbage_clock.formatting',
+    'garbage_clock.heap',
+    'garbage_clock.layout',
+    'garbage_clock.profiler',
+    'garbage_clock.render',
+    'garbage_clock.schedule',
+    'garbage_clock.timekeeping',
+    # Only imported when their setting is on
+    'garbage_clock.ringlog', # LOG_LEVEL
+    'garbage_clock.trace',   # TRACE_RECORDS
+    'garbage_clock.demo',    # DEMO
+    'digitalio',             # BUTTONS
+    'adafruit_debouncer',    # BUTTONS
+)
+
+
+def measure(name):
+    """ Import name, returning (ms, bytes allocated, bytes kept). """
+    gc.collect()
+    base = gc.mem_alloc()
+    start = time.monotonic_ns()
+    __import__(name)
+    elapsed = (time.monotonic_ns() - start) // 1000
+    allocated = gc.mem_alloc() - base
+    gc.collect()
+    return elapsed, allocated, gc.mem_alloc() - base
+
+
+def main():
+    gc.collect()
+    print('Free at start:', gc.mem_free(), 'bytes')
+    print('%-32s %9s %10s %8s' % ('module', 'ms', 'allocated', 'kept'))
+    total_us = total_allocated = total_kept = 0
+    for name in MODULES:
+        try:
+            elapsed, allocated, kept = measure(name)
+        except ImportError as error:
+            print('%-32s %s' % (name, error))
+            continue
+        total_us += elapsed
+        total_allocated += allocated
+        total_kept += kept
+        print('%-32s %5d.%03d %10d %8d' % (name, elapsed // 1000,
+                                           elapsed % 1000, allocated, kept))
+    print('%-32s %5d.%03d %10d %8d' % ('total', total_us // 1000,
+                                       total_us % 1000, total_allocated,
+                                       total_kept))
+    print('Free at end:', gc.mem_free(), 'bytes')
+
+
+main()
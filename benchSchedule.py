@@ -0,0 +1,233 @@
+"""
+Week sweep for the garbage schedule, under CPython: every one of the
+10,080 minutes of a week goes through the clock's ScheduleTable (with the
+SCHEDULE in garbageClockAIO.py) and, in both 12- and 24-hour modes,
+through hh_mm() and TextFormatter.time(). Checks they agree with the
+reference implementations below, prints the full table of state changes,
+and reports calls per second and bytes allocated per call for each.
+
+    python3 benchSchedule.py [runs]
+
+Exits with status 1 if anything disagrees, so a faster schedule or
+formatter can be proven to give the same answers: add it to
+IMPLEMENTATIONS or FORMATTERS and run this again. The schedule reference
+reads SCHEDULE row by row, so this also checks an edited SCHEDULE; the
+minutes where it differs from the original if/elif chain are only
+counted, since after an edit they're meant to. CPython boxes ints above
+256, so week minutes show up as allocations that don't happen on the
+board.
+"""
+
+import ast
+import calendar
+import sys
+import time
+import tracemalloc
+from garbage_clock.formatting import TextFormatter, hh_mm
+from garbage_clock.schedule import MINUTES_PER_WEEK, WEEKDAY_NAMES, \
+    ScheduleTable
+
+WEEK_START = calendar.timegm((2021, 1, 3, 0, 0, 0)) # A Sunday at midnight
+
+
+def clock_schedule(path='garbageClockAIO.py'):
+    """ The SCHEDULE setting from the clock's code, without running it. """
+    with open(path) as file:
+        tree = ast.parse(file.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and \
+                any(getattr(target, 'id', None) == 'SCHEDULE'
+                    for target in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError('no SCHEDULE in ' + path)
+
+
+def chain_classify(wday, hour, minute):
+    """ The if/elif chain update_time() had before ScheduleTable, kept as
+        the reference. Weekday 0 is Sunday. Note the Wednesday test,
+        hour <= 7 and minute <= 59, was commented as 5am to 7:59am but
+        also takes midnight to 5am (minute <= 59 is always true); the
+        schedule table keeps that behaviour, NOW from Tuesday 7pm until
+        Wednesday 8am.
+    """
+    if wday == 0:
+        return ("SUN", "3 days", "green", 0x33CC33)
+    elif wday == 1:
+        return ("MON", "2 days", "green", 0x33CC33)
+    elif wday == 2 and hour < 19:
+        return ("TUE", "2nite", "yellow", 0xFFFF00)
+    elif wday == 2 and hour >= 19:
+        return ("TUE", "NOW", "red", 0xFF0000)
+    elif wday == 3 and hour <= 7 and minute <= 59:
+        return ("WED", "NOW", "red", 0xFF0000)
+    elif wday == 3 and hour >= 8:
+        return ("WED", "done", "green", 0x33CC33)
+    elif wday == 4:
+        return ("THU", "6 days", "green", 0x33CC33)
+    elif wday == 5:
+        return ("FRI", "5 days", "green", 0x33CC33)
+    elif wday == 6:
+        return ("SAT", "4 days", "green", 0x33CC33)
+    return None # The chain left the state unset
+
+
+def rules_classify(schedule):
+    """ Reference classify for the rows of schedule, the slow way: the
+        state of the last row started at or before the time, or if none
+        has started yet this week, of the last row of the week.
+    """
+    rows = sorted(schedule)
+
+    def classify(wday, hour, minute):
+        state = rows[-1]
+        for row in rows:
+            if row[:3] <= (wday, hour, minute):
+                state = row
+        return (WEEKDAY_NAMES[state[0]],) + tuple(state[3:])
+    return classify
+
+
+def reference_hh_mm(hour, minute, twelve_hour):
+    """ Clock face time spelled out the long way. """
+    if twelve_hour:
+        return '%d:%02d' % ((hour + 11) % 12 + 1, minute)
+    return '%02d:%02d' % (hour, minute)
+
+
+def week():
+    """ (wday, hour, minute, time.struct_time) for each minute of the
+        week, wday counting from Sunday.
+    """
+    minutes = []
+    for week_minute in range(MINUTES_PER_WEEK):
+        struct = time.gmtime(WEEK_START + week_minute * 60)
+        minutes.append(((struct.tm_wday + 1) % 7, struct.tm_hour,
+                        struct.tm_min, struct))
+    return minutes
+
+
+def table_implementation(schedule):
+    table = ScheduleTable(schedule)
+    return table.classify
+
+
+IMPLEMENTATIONS = (
+    ('rules', rules_classify),
+    ('table', table_implementation),
+)
+
+FORMATTERS = (
+    ('hh_mm', lambda twelve_hour: lambda wday, hour, minute, struct:
+     hh_mm(struct, twelve_hour)),
+    ('TextFormatter', lambda twelve_hour: lambda wday, hour, minute, struct,
+     time_text=TextFormatter(twelve_hour).time: time_text(hour, minute)),
+)
+
+
+def bytes_per_call(call, minutes):
+    """ Largest and mean bytes allocated by one call over the week. """
+    tracemalloc.start()
+    worst = total = 0
+    for wday, hour, minute, struct in minutes:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        call(wday, hour, minute, struct)
+        allocated = tracemalloc.get_traced_memory()[1] - before
+        worst = max(worst, allocated)
+        total += allocated
+    tracemalloc.stop()
+    return worst, total / len(minutes)
+
+
+def calls_per_second(call, minutes, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        for wday, hour, minute, struct in minutes:
+            call(wday, hour, minute, struct)
+    return runs * len(minutes) / (time.perf_counter() - start)
+
+
+def transitions(states):
+    """ (week minute, old state, new state) for each change of state,
+        starting from last week's final state.
+    """
+    changes = []
+    for i, state in enumerate(states):
+        if state != states[i - 1]:
+            changes.append((i, states[i - 1], state))
+    return changes
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    schedule = clock_schedule()
+    minutes = week()
+    failures = 0
+
+    print('%-28s %12s %10s %10s' % ('', 'calls/s', 'max bytes',
+                                   'mean bytes'))
+    sweeps = {}
+    for name, make in IMPLEMENTATIONS:
+        classify = make(schedule)
+        sweeps[name] = [classify(wday, hour, minute)
+                        for wday, hour, minute, _ in minutes]
+        call = lambda wday, hour, minute, struct: classify(wday, hour, minute)
+        print('%-28s %12.0f %10d %10.1f' % (
+            (name,) + (calls_per_second(call, minutes, runs),) +
+            bytes_per_call(call, minutes)))
+    for twelve_hour in (True, False):
+        for name, make in FORMATTERS:
+            call = make(twelve_hour)
+            label = '%s %s' % (name, '12h' if twelve_hour else '24h')
+            for wday, hour, minute, struct in minutes:
+                text = call(wday, hour, minute, struct)
+                if text != reference_hh_mm(hour, minute, twelve_hour):
+                    print('MISMATCH %s %s %02d:%02d: %r' %
+                          (label, WEEKDAY_NAMES[wday], hour, minute, text))
+                    failures += 1
+            print('%-28s %12.0f %10d %10.1f' % (
+                (label,) + (calls_per_second(call, minutes, runs),) +
+                bytes_per_call(call, minutes)))
+
+    reference = sweeps['rules']
+    for name, states in sweeps.items():
+        for (wday, hour, minute, _), expected, state in zip(minutes,
+                                                           reference, states):
+            if state is None or tuple(state) != expected:
+                print('MISMATCH %s %s %02d:%02d: %r, expected %r' %
+                      (name, WEEKDAY_NAMES[wday], hour, minute, state,
+                       expected))
+                failures += 1
+
+    changes = transitions(sweeps['table'])
+    print('\n%-9s %-5s %-20s %s' % ('at', '24h', 'from', 'to'))
+    for week_minute, old, new in changes:
+        wday, hour, minute, struct = minutes[week_minute]
+        print('%s %-5s %-5s %-20s %s' % (
+            WEEKDAY_NAMES[wday], hh_mm(struct), hh_mm(struct, False),
+            '%s %s %s' % old[:3], '%s %s %s' % new[:3]))
+
+    # minutes_to_next() must count down to each change, wrapping the week
+    table = ScheduleTable(schedule)
+    starts = [week_minute for week_minute, _, _ in changes]
+    for week_minute, (wday, hour, minute, struct) in enumerate(minutes):
+        following = [start for start in starts if start > week_minute]
+        expected = (following[0] if following else
+                    starts[0] + MINUTES_PER_WEEK) - week_minute
+        if table.minutes_to_next(wday, hour, minute) != expected:
+            print('MISMATCH minutes_to_next %s %s: %d, expected %d' %
+                  (WEEKDAY_NAMES[wday], hh_mm(struct, False),
+                   table.minutes_to_next(wday, hour, minute), expected))
+            failures += 1
+    changed = len([1 for (wday, hour, minute, _), state in zip(minutes,
+                                                             reference)
+                   if chain_classify(wday, hour, minute) != state])
+    print('%d state changes a week; %d mismatches over %d minutes' %
+          (len(changes), failures, len(minutes)))
+    print('%d minutes differ from the original if/elif chain' % changed)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Heap allocation benchmark for parsing the AdafruitIO time struct response:
+the old path (response text -> json.loads -> dict lookups) against
+aio_time.parse_time_struct() reading the response bytes directly.
+
+Runs on the Matrix Portal (copy this to the board, with the garbage_clock
+package in /lib, and import it from the REPL) using gc.mem_alloc(), or under CPython using
+tracemalloc. Note CPython boxes ints above 256, so the year shows up there
+as a few bytes that don't exist on the board.
+"""
+
+import gc
+import json
+from garbage_clock.aio_time import STRUCT_KEYS, parse_time_struct
+
+RESPONSE = b'{"year":2021,"mon":1,"mday":2,"hour":17,"min":22,"sec":25,"wday":6,"yday":2,"isdst":0}'
+RUNS = 100
+
+try:
+    gc.mem_alloc # CircuitPython: heap in use, only grows while gc is off
+    def measure(func):
+        before = gc.mem_alloc()
+        func(RESPONSE)
+        return gc.mem_alloc() - before
+except AttributeError:
+    import tracemalloc # CPython frees immediately, so count the peak
+    tracemalloc.start()
+    def measure(func):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        func(RESPONSE)
+        return tracemalloc.get_traced_memory()[1] - before
+
+FIELDS = [0] * 9
+
+
+def old_parse(data):
+    """ What update_time() used to do with fetch_data()'s result. """
+    time_data = json.loads(data.decode('utf-8'))
+    for i, key in enumerate(('year', 'mon', 'mday', 'hour', 'min', 'sec',
+                             'wday', 'yday', 'isdst')):
+        FIELDS[i] = time_data[key]
+    return FIELDS
+
+
+def new_parse(data):
+    return parse_time_struct(data, FIELDS)
+
+
+def bytes_per_call(func):
+    """ Average heap bytes allocated by one call of func(RESPONSE), with
+        garbage collection held off so freed blocks don't hide anything.
+    """
+    func(RESPONSE) # Warm up (first call can intern strings etc.)
+    gc.collect()
+    gc.disable()
+    total = 0
+    for _ in range(RUNS):
+        total += measure(func)
+    gc.enable()
+    return total / RUNS
+
+
+def main():
+    old = bytes_per_call(old_parse)
+    expected = list(FIELDS)
+    new = bytes_per_call(new_parse)
+    assert FIELDS == expected, 'parsers disagree'
+    print('struct response:', len(RESPONSE), 'bytes,', len(STRUCT_KEYS), 'fields')
+    print('json.loads path: %d bytes allocated per sync' % old)
+    print('bytes parser:    %d bytes allocated per sync' % new)
+
+
+main()
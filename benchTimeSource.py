@@ -0,0 +1,185 @@
+"""
+Compare the clock's time sources under CPython on Linux: NtpTimeSource
+against a local NTP stand-in, and TimeClient against a local stand-in for
+AdafruitIO's time struct integration (plain HTTP, so the TLS handshake the
+board also pays for isn't counted). Reports latency and bytes on the wire
+per sync, and checks both sources agree.
+
+    python3 benchTimeSource.py [syncs] [utc_offset_hours] [dst_rule]
+"""
+
+import socket
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from garbage_clock.aio_time import (NtpTimeSource, TimeClient, dst_bounds,
+                                    gmtime)
+
+NTP_EPOCH = 2208988800 # Seconds from 1900-01-01 to 1970-01-01
+
+
+class Counter:
+    """ Bytes sent and received by one source. """
+    sent = 0
+    received = 0
+
+
+# STAND-INS ------------------------------------------------------------------
+
+def serve_ntp(sock):
+    """ Answer SNTP requests on sock with the host's clock. """
+    while True:
+        request, address = sock.recvfrom(48)
+        now = time.time() + NTP_EPOCH
+        seconds = int(now)
+        fraction = int((now - seconds) * (1 << 32))
+        reply = bytearray(48)
+        reply[0] = 0x24 # No leap warning, version 4, server mode
+        reply[1] = 1    # Stratum 1
+        reply[24:32] = request[40:48] # Originate = client's transmit time
+        struct.pack_into('>IIII', reply, 32, seconds, fraction, seconds,
+                         fraction)
+        sock.sendto(reply, address)
+
+
+def struct_handler(utc_offset, dst):
+    """ HTTP handler class answering like AdafruitIO's time struct. """
+    source = NtpTimeSource(lambda: int(time.time()), utc_offset, dst)
+
+    class Handler(BaseHTTPRequestHandler):
+        wbufsize = 4096 # Send headers and body in one segment
+
+        def do_GET(self):
+            f = source.fetch()
+            body = ('{"year":%d,"mon":%d,"mday":%d,"hour":%d,"min":%d,'
+                    '"sec":%d,"wday":%d,"yday":%d,"isdst":%d}' %
+                    tuple(f)).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+# CLIENTS --------------------------------------------------------------------
+
+def sntp_client(host, port, counter, timeout=2):
+    """ get_utc callable for NtpTimeSource doing a plain SNTP query. """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(timeout)
+    request = bytearray(48)
+    request[0] = 0x23 # Version 4, client mode
+
+    def get_utc():
+        sock.sendto(request, (host, port))
+        reply = sock.recv(48)
+        counter.sent += len(request)
+        counter.received += len(reply)
+        return struct.unpack_from('>I', reply, 40)[0] - NTP_EPOCH
+
+    return get_utc
+
+
+class Response:
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    def close(self):
+        pass
+
+
+class KeepAliveRequests:
+    """ Just enough of adafruit_requests for TimeClient: one HTTP/1.1
+        keep-alive connection to host:port, counting bytes on the wire.
+    """
+    def __init__(self, host, port, counter):
+        self.address = (host, port)
+        self.counter = counter
+        self.sock = None
+
+    def get(self, url, headers=None, timeout=10):
+        path = url[url.index('/', url.index('//') + 2):]
+        request = 'GET %s HTTP/1.1\r\nHost: io.adafruit.com\r\n' % path
+        for name, value in (headers or {}).items():
+            request += '%s: %s\r\n' % (name, value)
+        request = (request + '\r\n').encode()
+        if self.sock is None:
+            self.sock = socket.create_connection(self.address, timeout)
+        self.sock.sendall(request)
+        self.counter.sent += len(request)
+        data = b''
+        while b'\r\n\r\n' not in data:
+            data += self.sock.recv(1024)
+        head, _, body = data.partition(b'\r\n\r\n')
+        length = 0
+        for line in head.split(b'\r\n')[1:]:
+            name, _, value = line.partition(b':')
+            if name.strip().lower() == b'content-length':
+                length = int(value)
+        while len(body) < length:
+            body += self.sock.recv(1024)
+        self.counter.received += len(head) + 4 + len(body)
+        return Response(int(head.split()[1]), body)
+
+
+# BENCHMARK ------------------------------------------------------------------
+
+def run(name, source, counter, syncs):
+    """ Fetch syncs times from source and print per-sync stats. The
+        sources' own latency counters are whole milliseconds, which is
+        plenty on the board but too coarse for localhost, so time here.
+    """
+    times = []
+    for _ in range(syncs):
+        start = time.perf_counter_ns()
+        fields = source.fetch()
+        times.append((time.perf_counter_ns() - start) / 1000)
+    first = times[0] # Includes connection setup
+    times.sort()
+    print('%-10s first %7.1f us  median %7.1f us  max %7.1f us  %5.1f bytes/sync'
+          % (name, first, times[len(times) // 2], times[-1],
+             (counter.sent + counter.received) / syncs))
+    return fields
+
+
+def main():
+    syncs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    utc_offset = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    dst = sys.argv[3] if len(sys.argv) > 3 else None
+    if dst: # Fail early on a bad rule name
+        dst_bounds(gmtime(0).tm_year, dst, 0)
+
+    ntp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    ntp_sock.bind(('127.0.0.1', 0))
+    threading.Thread(target=serve_ntp, args=(ntp_sock,), daemon=True).start()
+    http = HTTPServer(('127.0.0.1', 0), struct_handler(utc_offset, dst))
+    http.protocol_version = 'HTTP/1.1'
+    http.RequestHandlerClass.protocol_version = 'HTTP/1.1'
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+
+    ntp_bytes = Counter()
+    ntp = NtpTimeSource(sntp_client('127.0.0.1', ntp_sock.getsockname()[1],
+                                    ntp_bytes), utc_offset, dst)
+    aio_bytes = Counter()
+    aio = TimeClient(KeepAliveRequests('127.0.0.1', http.server_port,
+                                       aio_bytes), 'username', 'key')
+
+    print(syncs, 'syncs each against local stand-ins')
+    ntp_fields = run('NTP', ntp, ntp_bytes, syncs)
+    aio_fields = run('AdafruitIO', aio, aio_bytes, syncs)
+    # Allow for a second ticking over between the two runs
+    if ntp_fields[:5] != aio_fields[:5] or ntp_fields[6:] != aio_fields[6:]:
+        print('MISMATCH', ntp_fields, aio_fields)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Time sync latency benchmark for the Matrix Portal: the old per-sync
+NETWORK.fetch_data() with the AIO key in the URL, against aio_time's
+TimeClient reusing one adafruit_requests session. Copy this to code.py
+(with the garbage_clock package in /lib and secrets.py on the board) and
+watch the serial console.
+"""
+
+# pylint: disable=import-error
+import time
+import board
+import adafruit_requests
+from adafruit_matrixportal.network import Network
+from garbage_clock.aio_time import TimeClient
+
+try:
+    from secrets import secrets
+except ImportError:
+    print('WiFi secrets are kept in secrets.py, please add them there!')
+    raise
+
+SYNCS = 10
+
+network = Network(status_neopixel=board.NEOPIXEL, debug=False)
+network.connect()
+
+aio_username = secrets["aio_username"]
+aio_key = secrets["aio_key"]
+timezone = secrets.get("timezone")
+
+
+def old_sync():
+    """ update_time()'s fetch before TimeClient: URL rebuilt every time. """
+    time_url = 'https://io.adafruit.com/api/v2/' + aio_username + '/integrations/time/struct/?x-aio-key=' + aio_key
+    if timezone:
+        time_url += '&tz=' + timezone
+    return network.fetch_data(time_url, timeout=10)
+
+
+def report(name, times):
+    """ Print latency stats; the first sync includes DNS and connecting. """
+    first = times[0]
+    times.sort()
+    print(name, "ms: first", first, "min", times[0],
+          "median", times[len(times) // 2], "max", times[-1])
+
+
+for name, sync in (("fetch_data", old_sync),
+                   ("TimeClient", TimeClient(adafruit_requests, aio_username,
+                                             aio_key, timezone).fetch)):
+    times = []
+    for _ in range(SYNCS):
+        start = time.monotonic_ns()
+        sync()
+        times.append((time.monotonic_ns() - start) // 1000000)
+        time.sleep(1)
+    report(name, times)
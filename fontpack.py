@@ -0,0 +1,128 @@
+"""
+Convert BDF fonts to the GARBAGE CLOCK's packed .gfa format (see
+garbage_clock/packed_font.py), keeping only the glyphs the clock needs.
+Runs under CPython on your computer; copy the output to /fonts on the
+Matrix Portal.
+
+    python3 fontpack.py helvB12.bdf helvB12.gfa --clock large
+    python3 fontpack.py helvR10.bdf helvR10.gfa --clock small
+
+--clock takes the characters the clock draws in its large or small font
+from the clock's code (its TWELVE_HOUR, SCHEDULE and OTHER_TEXT settings,
+read without running it), so the fonts keep up with changes to the schedule; --code
+picks another version of the clock. --chars gives the characters instead.
+"""
+
+import argparse
+import ast
+import struct
+import sys
+from garbage_clock.fonts import clock_chars
+from garbage_clock.formatting import TextFormatter
+from garbage_clock.packed_font import HEADER, MAGIC, RECORD
+from garbage_clock.schedule import ScheduleTable
+
+
+def read_bdf(path):
+    """ Return (bounding_box, glyphs) from a BDF file, where glyphs maps
+        code point -> (width, height, dx, dy, shift_x, rows) and rows is a
+        list of bytes, one per bitmap row.
+    """
+    bounding_box = None
+    glyphs = {}
+    with open(path, encoding='latin-1') as file:
+        lines = iter(file)
+        for line in lines:
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == 'FONTBOUNDINGBOX':
+                bounding_box = tuple(int(n) for n in words[1:5])
+            elif words[0] == 'STARTCHAR':
+                code_point = shift_x = None
+                box = (0, 0, 0, 0)
+                for line in lines:
+                    words = line.split()
+                    if words[0] == 'ENCODING':
+                        code_point = int(words[1])
+                    elif words[0] == 'DWIDTH':
+                        shift_x = int(words[1])
+                    elif words[0] == 'BBX':
+                        box = tuple(int(n) for n in words[1:5])
+                    elif words[0] == 'BITMAP':
+                        rows = [bytes.fromhex(next(lines).strip())
+                                for _ in range(box[1])]
+                    elif words[0] == 'ENDCHAR':
+                        break
+                if code_point is not None and code_point >= 0:
+                    stride = (box[0] + 7) // 8
+                    glyphs[code_point] = box + (shift_x,
+                                                [row[:stride] for row in rows])
+    if bounding_box is None:
+        raise ValueError(path + ' has no FONTBOUNDINGBOX')
+    return bounding_box, glyphs
+
+
+def clock_settings(path, *names):
+    """ Values of the named settings in the clock's code, without running
+        it, in the order asked for.
+    """
+    with open(path) as file:
+        tree = ast.parse(file.read())
+    values = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if getattr(target, 'id', None) in names:
+                    values[target.id] = ast.literal_eval(node.value)
+    missing = [name for name in names if name not in values]
+    if missing:
+        raise ValueError('no %s in %s' % (', '.join(missing), path))
+    return [values[name] for name in names]
+
+
+def pack(bounding_box, glyphs):
+    """ Return the .gfa file contents for the given glyphs. """
+    table = b''
+    data = b''
+    for code_point in sorted(glyphs):
+        width, height, dx, dy, shift_x, rows = glyphs[code_point]
+        table += struct.pack(RECORD, code_point, width, height, dx, dy,
+                             shift_x, len(data))
+        data += b''.join(rows)
+    return struct.pack(HEADER, MAGIC, len(glyphs), *bounding_box,
+                       len(data)) + table + data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('bdf', help='BDF font to convert')
+    parser.add_argument('output', help='.gfa file to write')
+    parser.add_argument('--chars', help='characters to keep (default all)')
+    parser.add_argument('--clock', choices=('large', 'small'),
+                        help="keep the characters the clock draws in this font")
+    parser.add_argument('--code', default='garbageClockAIO.py',
+                        help='version of the clock for --clock')
+    args = parser.parse_args()
+    if args.clock:
+        twelve_hour, schedule, other_text = clock_settings(
+            args.code, 'TWELVE_HOUR', 'SCHEDULE', 'OTHER_TEXT')
+        large, small = clock_chars(TextFormatter(twelve_hour),
+                                   ScheduleTable(schedule), other_text)
+        args.chars = large if args.clock == 'large' else small
+
+    bounding_box, glyphs = read_bdf(args.bdf)
+    if args.chars:
+        missing = [c for c in args.chars if ord(c) not in glyphs]
+        if missing:
+            print('Not in font:', ''.join(missing), file=sys.stderr)
+        glyphs = {ord(c): glyphs[ord(c)] for c in set(args.chars)
+                  if ord(c) in glyphs}
+    packed = pack(bounding_box, glyphs)
+    with open(args.output, 'wb') as file:
+        file.write(packed)
+    print('%s: %d glyphs, %d bytes' % (args.output, len(glyphs), len(packed)))
+
+
+if __name__ == '__main__':
+    main()
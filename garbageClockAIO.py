@@ -17,23 +17,30 @@ BDF fonts from the X.Org project.
 import gc
 import time
 import math
-import random
-import json
 import board
 import busio
 import displayio
-import terminalio
+import microcontroller
+import supervisor
 import sys
+from micropython import const
 from rtc import RTC
 from adafruit_matrixportal.network import Network
 from adafruit_matrixportal.matrix import Matrix
-from digitalio import DigitalInOut, Pull
-from adafruit_debouncer import Debouncer
 #from adafruit_matrixportal.matrixportal import MatrixPortal
-from adafruit_bitmap_font import bitmap_font
 import adafruit_display_text.label
 import adafruit_lis3dh
 import adafruit_requests
+from garbage_clock.aio_time import TimeClient, NtpTimeSource
+from garbage_clock.fonts import PreloadedFont, load_font, clock_chars
+from garbage_clock.formatting import TextFormatter
+from garbage_clock.heap import GcPolicy, HeapMeter
+from garbage_clock.layout import Layout
+from garbage_clock.profiler import Profiler, SYNC, CLASSIFY, COLLECT, SLEEP
+from garbage_clock.render import BitmapCache, FrameRenderer, OutlinedText
+from garbage_clock.schedule import ScheduleTable, is_night
+from garbage_clock.timekeeping import (TickScheduler, DriftEstimator,
+                                       SyncRetryPolicy, Checkpoint, sync_rtc)
 
 try:
     from secrets import secrets
@@ -46,126 +53,118 @@ except ImportError:
 TWELVE_HOUR = True  # If set, use 12-hour time vs 24-hour (e.g. 3:00 vs 15:00)
 BITPLANES = 6       # Ideally 6, but can set lower if RAM is tight
 DEMO = False        # Enable / Disable demo mode to scroll through each day
+DEMO_START = 1609653600 # Demo calendar starts here: Sunday 1/3/21, 6am
+DEMO_SPEED = 3600   # Demo seconds per real second (3600 = an hour a second)
+DEMO_STEP = 1       # Real seconds between demo clock updates
+BUTTONS = False     # Set up the up/down buttons (not used by the clock yet)
+TIME_SOURCE = 'aio' # 'aio' for AdafruitIO, or 'ntp' to ask the WiFi chip for
+                    # NTP time (needs utc_offset and optionally dst, 'us' or
+                    # 'eu', in secrets.py); AdafruitIO is the fallback
+BITMAP_BUDGET = 2048  # Bytes of RAM for decoded garbage can images (0 = disk)
+SYNC_INTERVAL = 600 # Shortest time between time server syncs (seconds)
+MAX_SYNC_INTERVAL = 6 * 3600 # Longest, once RTC drift has been trimmed out
+DRIFT_BOUND = 3     # Seconds the RTC may wander before syncs come sooner
+RETRY_BASE = 60     # First retry after a failed sync (seconds), then doubles...
+RETRY_CAP = 1800    # ...up to this
+RETRY_TRIPS = 6     # Failures in a row before giving the server a rest...
+RETRY_OPEN = 3600   # ...of this long between attempts, running on RTC time
+CHECKPOINT_INTERVAL = 6 * 3600 # Most often the synced time is saved to NVM
+GC_MIN_FREE = 16384 # Collect garbage when less than this many bytes are free
+PROFILE = True      # Time main loop phases; type p at the serial console for
+                    # a summary, r to start over
+LOG_LEVEL = const(1) # 0 off, 1 errors, 2 info, 3 debug; messages are kept in
+                     # memory, type l at the serial console to print them
+LOG_SIZE = 2048     # Bytes of log kept, oldest messages are dropped first
+LOG_ECHO = False    # Also print messages as they're logged
+TRACE_RECORDS = 256 # Main loop iterations kept in the trace (16 bytes each,
+                    # 0 off); type t at the serial console to dump them
+NIGHT_START = 22    # Display is blank from this hour...
+NIGHT_END = 6       # ...until this hour (this thing is BRIGHT)
+
+# Garbage pickup schedule. Each row is the (weekday, hour, minute) a state
+# starts, with weekday 0 = Sunday as in AdafruitIO's wday; the state lasts
+# until the next row starts. Then the garbage text, can color and text color.
+SCHEDULE = (
+    (0,  0, 0, "3 days", "green",  0x33CC33), # Sunday
+    (1,  0, 0, "2 days", "green",  0x33CC33), # Monday
+    (2,  0, 0, "2nite",  "yellow", 0xFFFF00), # Tuesday before 7pm
+    (2, 19, 0, "NOW",    "red",    0xFF0000), # Tuesday after 7pm
+    (3,  0, 0, "NOW",    "red",    0xFF0000), # Wednesday until 7:59am
+    (3,  8, 0, "done",   "green",  0x33CC33), # Wednesday after pickup
+    (4,  0, 0, "6 days", "green",  0x33CC33), # Thursday
+    (5,  0, 0, "5 days", "green",  0x33CC33), # Friday
+    (6,  0, 0, "4 days", "green",  0x33CC33), # Saturday
+)
+
+# Small font text other than dates, weekdays and SCHEDULE: the unsynced
+# placeholder, the missing splash image and the labels' initial text
+OTHER_TEXT = ('???', 'OOPS', '99.9%', '12/31', '12:00')
 
 # SOME UTILITY FUNCTIONS AND CLASSES ---------------------------------------
 
-def update_time(timezone=None, demo_num=0, demo_hour="7"):
-    """ Update system date/time from AdafruitIO. Returns current local time
-        as a time.struct_time. This may throw an exception on fetch_data() -
-        it is NOT CAUGHT HERE, should be handled in the calling code because
-        different behaviors may be needed in different situations (e.g.
-        reschedule for later).
-    """
-    aio_username = secrets["aio_username"]
-    aio_key = secrets["aio_key"]
-
-    if timezone: # Use timezone api
-        #time_url = 'http://worldtimeapi.org/api/timezone/' + timezone
-        time_url = 'https://io.adafruit.com/api/v2/' + aio_username + '/integrations/time/struct/?x-aio-key=' + aio_key + '&tz=' + timezone
-    else: # Use IP geolocation
-        time_url = 'https://io.adafruit.com/api/v2/' + aio_username + '/integrations/time/struct/?x-aio-key=' + aio_key
+# Log levels, guarded as "if LOG_LEVEL // INFO:" so the compiler drops
+# disabled log calls altogether (see garbage_clock/ringlog.py)
+ERROR = const(1)
+INFO = const(2)
+DEBUG = const(3)
 
-    if DEMO == False:
-        time_data_str = NETWORK.fetch_data(time_url, timeout=10)
-        time_data = json.loads(time_data_str)
 
-    else:
-        year = str(random.randint(2021,2024))
-        month = str(random.randint(1,12))
-        day = str(random.randint(1,28))
-        if demo_hour:
-            hour = demo_hour
-        else:
-            hour = str(random.randint(6,20))
-            # hour = str(random.randint(0,23)) # will occasionally show night mode
-        minute = str(random.randint(10,59))
-        weekday = str(random.randint(0,6))
-        demoDateTime = '{"year":' + year + ',"mon":' + month + ',"mday":' + day + ',"hour":' + hour +', "min":' + minute + ',"sec":25,"wday":' + weekday + ',"yday":2,"isdst":0}'
-        # AdafruitIO JSON example: {"year":2021,"mon":1,"mday":2,"hour":17,"min":22,"sec":25,"wday":6,"yday":2,"isdst":0}
-        time_data = json.loads(demoDateTime)
-
-    #time_struct = parse_time(time_data[0], time_data[1])
-    time_struct = time.struct_time(time_data["year"], time_data["mon"], time_data["mday"],
-            time_data["hour"], time_data["min"], time_data["sec"], time_data["wday"],
-                time_data["yday"], time_data["isdst"])
-    if time_data["wday"] == 0: # Sunday
-        weekday = "SUN"
-        garbage = "3 days"
-        color = "green"
-        hcolor = 0x33CC33
-    elif time_data["wday"] == 1: # Monday
-        weekday = "MON"
-        garbage = "2 days"
-        color = "green"
-        hcolor = 0x33CC33
-    elif time_data["wday"] == 2 and time_data["hour"] < 19: # Tuesday before 7pm
-        weekday = "TUE"
-        garbage = "2nite"
-        color = "yellow"
-        hcolor = 0xFFFF00
-    elif time_data["wday"] == 2 and time_data["hour"] >= 19: # Tuesday after 7pm
-        weekday = "TUE"
-        garbage = "NOW"
-        color = "red"
-        hcolor = 0xFF0000
-    elif time_data["wday"] == 3 and time_data["hour"] <= 7 and time_data["min"] <= 59: # Wednesday 5am - 7:59am
-        weekday = "WED"
-        garbage = "NOW"
-        color = "red"
-        hcolor = 0xFF0000
-    elif time_data["wday"] == 3 and time_data["hour"] >= 8 : # Wednesday after 9am
-        weekday = "WED"
-        garbage = "done"
-        color = "green"
-        hcolor = 0x33CC33
-    elif time_data["wday"] == 4: # Thursday
-        weekday = "THU"
-        garbage = "6 days"
-        color = "green"
-        hcolor = 0x33CC33
-    elif time_data["wday"] == 5: # Friday
-        weekday = "FRI"
-        garbage = "5 days"
-        color = "green"
-        hcolor = 0x33CC33
-    elif time_data["wday"] == 6: # Saturday
-        weekday = "SAT"
-        garbage = "4 days"
-        color = "green"
-        hcolor = 0x33CC33
-
-    RTC().datetime = time_struct
-    return time_struct, weekday, garbage, color, hcolor
-
-
-def hh_mm(time_struct):
-    """ Given a time.struct_time, return a string as H:MM or HH:MM, either
-        12- or 24-hour style depending on global TWELVE_HOUR setting.
-    """
-    if TWELVE_HOUR:
-        if time_struct.tm_hour > 12:
-            hour_string = str(time_struct.tm_hour - 12) # 13-23 -> 1-11 (pm)
-        elif time_struct.tm_hour > 0:
-            hour_string = str(time_struct.tm_hour) # 1-12
-        else:
-            hour_string = '12' # 0 -> 12 (am)
-    else:
-        hour_string = '{0:0>2}'.format(time_struct.tm_hour)
-    return hour_string + ':' + '{0:0>2}'.format(time_struct.tm_min)
+def show_frame(localnow, weekday, garbage, color, hcolor):
+    """ Draw localnow (a time.struct_time) with the given schedule state. """
+    # Don't draw anything at night (this thing is BRIGHT)
+    # Show time in orange if AM, blue if PM
+    RENDERER.draw(is_night(localnow.tm_hour, NIGHT_START, NIGHT_END),
+                  FORMATTER.time(localnow.tm_hour, localnow.tm_min),
+                  (0xFF6600 if localnow.tm_hour < 12 else 0x3300CC),
+                  FORMATTER.date(localnow.tm_mon, localnow.tm_mday),
+                  FORMATTER.weekday(weekday), garbage, color, hcolor)
+
+
+def serial_command():
+    """ A character typed at the serial console, or None. Doesn't block. """
+    if supervisor.runtime.serial_bytes_available:
+        return sys.stdin.read(1)
+    return None
+
 
 
 # ONE-TIME INITIALIZATION --------------------------------------------------
+
+# Modules only some settings need are imported just when they're enabled,
+# leaving that RAM for bitplanes and images (benchImports.py measures each)
+if DEMO: # Only the demo makes up times
+    from garbage_clock.demo import DemoClock
+if BUTTONS:
+    from digitalio import DigitalInOut, Pull
+    from adafruit_debouncer import Debouncer
+if LOG_LEVEL:
+    from garbage_clock.ringlog import RingLog
+    LOG = RingLog(LOG_SIZE, LOG_ECHO)
+else:
+    LOG = None
+if TRACE_RECORDS:
+    from garbage_clock.trace import (TraceRecorder, SYNC_OK, SYNC_FAILED,
+                                     REFRESHED)
+    TRACE = TraceRecorder(TRACE_RECORDS)
+else:
+    TRACE = None
+
+GARBAGE_SCHEDULE = ScheduleTable(SCHEDULE)
+DRIFT = DriftEstimator(DRIFT_BOUND, SYNC_INTERVAL, MAX_SYNC_INTERVAL)
+SYNC_RETRY = SyncRetryPolicy(RETRY_BASE, RETRY_CAP, RETRY_TRIPS, RETRY_OPEN)
+
 # set up the display
 MATRIX = Matrix(bit_depth=BITPLANES)
 DISPLAY = MATRIX.display
 
 #set up the buttons - not currently working
-pin_down = DigitalInOut(board.BUTTON_DOWN)
-pin_down.switch_to_input(pull=Pull.UP)
-button_down = Debouncer(pin_down)
-pin_up = DigitalInOut(board.BUTTON_UP)
-pin_up.switch_to_input(pull=Pull.UP)
-button_up = Debouncer(pin_up)
+if BUTTONS:
+    pin_down = DigitalInOut(board.BUTTON_DOWN)
+    pin_down.switch_to_input(pull=Pull.UP)
+    button_down = Debouncer(pin_down)
+    pin_up = DigitalInOut(board.BUTTON_UP)
+    pin_up.switch_to_input(pull=Pull.UP)
+    button_up = Debouncer(pin_up)
 
 ACCEL = adafruit_lis3dh.LIS3DH_I2C(busio.I2C(board.SCL, board.SDA),
                                    address=0x19)
@@ -175,51 +174,92 @@ DISPLAY.rotation = (int(((math.atan2(-ACCEL.acceleration.y,
                                      -ACCEL.acceleration.x) + math.pi) /
                          (math.pi * 2) + 0.875) * 4) % 4) * 90
 
-LARGE_FONT = bitmap_font.load_font('/fonts/helvB12.bdf')
-SMALL_FONT = bitmap_font.load_font('/fonts/helvR10.bdf')
-LARGE_FONT.load_glyphs('0123456789:')
-SMALL_FONT.load_glyphs('0123456789:/.%')
+# Preload every glyph the clock can show so none is parsed mid-render.
+# Large font: times. Small font: dates, weekdays (padded with spaces),
+# schedule text and OTHER_TEXT. fontpack.py --clock packs the same set.
+FORMATTER = TextFormatter(TWELVE_HOUR)
+LARGE_CHARS, SMALL_CHARS = clock_chars(FORMATTER, GARBAGE_SCHEDULE, OTHER_TEXT)
+LARGE_FONT = PreloadedFont(load_font('helvB12'), LARGE_CHARS,
+                           LOG if LOG_LEVEL // INFO else None)
+SMALL_FONT = PreloadedFont(load_font('helvR10'), SMALL_CHARS,
+                           LOG if LOG_LEVEL // INFO else None)
+if LARGE_FONT.missing or SMALL_FONT.missing:
+    print('not in fonts, will draw blank: %r %r' % (LARGE_FONT.missing,
+                                                     SMALL_FONT.missing))
 
 # Display group is set up once, then we just shuffle items around later.
 # Order of creation here determines their stacking order.
-GROUP = displayio.Group(max_size=10)
+GROUP = displayio.Group(max_size=5)
 
 # sets empty_group for night mode
 empty_group = displayio.Group()
 
-# Element 0 is a stand-in item, later replaced with the garbage can bitmap
+# Element 0 is a stand-in item, later replaced with the garbage can bitmap.
+# Its file is closed once the first real frame has replaced it.
 # pylint: disable=bare-except
+SPLASH_FILE = None
 try:
     FILENAME = 'bmps/garbage-start-' + str(DISPLAY.rotation) + '.bmp'
-    BITMAP = displayio.OnDiskBitmap(open(FILENAME, 'rb'))
-    TILE_GRID = displayio.TileGrid(BITMAP, pixel_shader=displayio.ColorConverter(),)
-    GROUP.append(TILE_GRID)
+    SPLASH_FILE = open(FILENAME, 'rb')
+    GROUP.append(displayio.TileGrid(displayio.OnDiskBitmap(SPLASH_FILE),
+                                    pixel_shader=displayio.ColorConverter(),))
 except:
+    if SPLASH_FILE:
+        SPLASH_FILE.close()
+        SPLASH_FILE = None
     GROUP.append(adafruit_display_text.label.Label(SMALL_FONT, color=0xFF0000,
                                                    text='OOPS'))
     GROUP[0].x = (DISPLAY.width - GROUP[0].bounding_box[2] + 1) // 2
     GROUP[0].y = DISPLAY.height // 2 - 1
-# Elements 1-4 are an outline around the moon percentage -- text labels
-# offset by 1 pixel up/down/left/right. Initial position is off the matrix,
-# updated on first refresh. Initial text value must be long enough for
-# longest anticipated string later.
-for i in range(4):
-    GROUP.append(adafruit_display_text.label.Label(SMALL_FONT, color=0,
-                                                   text='99.9%', y=-99))
-# Element 5 is days until garbage out (on top of the outline labels)
-GROUP.append(adafruit_display_text.label.Label(SMALL_FONT, color=0xFFFF00,
-                                               text='99.9%', y=-99))
-# Element 6 is the current time
+# Element 1 is days until garbage out, outlined so it reads over the can.
+# Initial position is off the matrix, updated on first refresh. The canvas
+# is as wide as the garbage can image.
+GROUP.append(OutlinedText(SMALL_FONT, 32, color=0xFFFF00, text='99.9%'))
+GROUP[1].y = -99
+# Element 2 is the current time
 GROUP.append(adafruit_display_text.label.Label(LARGE_FONT, color=0x808080,
                                                text='12:00', y=-99))
-# Element 7 is the current date
+# Element 3 is the current date
 GROUP.append(adafruit_display_text.label.Label(SMALL_FONT, color=0x808080,
                                                text='12/31', y=-99))
-# Element 8 is the time of (or time to) next rise/set event
+# Element 4 is the day of week
 GROUP.append(adafruit_display_text.label.Label(SMALL_FONT, color=0x00FF00,
                                                text='12:00', y=-99))
 DISPLAY.show(GROUP)
 
+# Garbage can images are loaded once per color and reused from here on
+CAN_CACHE = BitmapCache('bmps/garbage_can_{}.bmp', BITMAP_BUDGET)
+PROFILER = Profiler(PROFILE)
+# From here on the display is only repainted when a frame actually changes
+RENDERER = FrameRenderer(DISPLAY, GROUP, empty_group, CAN_CACHE,
+                         Layout(DISPLAY), PROFILER,
+                         LOG if LOG_LEVEL // DEBUG else None)
+DISPLAY.auto_refresh = False
+
+# Put up a real frame from the NVM checkpoint before the slow WiFi connect
+TIME_VALID = False # Set once the RTC is known to hold synced time
+STATE = -1         # Index of the schedule state shown, -1 if unknown
+CHECKPOINT = Checkpoint(microcontroller.nvm, CHECKPOINT_INTERVAL)
+SAVED = CHECKPOINT.load(len(GARBAGE_SCHEDULE.states))
+if SAVED and DEMO == False:
+    DRIFT.rate_ppm, CALIBRATION, DRIFT.interval = SAVED[1:4]
+    DRIFT.set_calibration(CALIBRATION)
+    if time.time() >= SAVED[0]:
+        # RTC kept running through a soft reset, so it is still synced
+        TIME_VALID = True
+        LOCALNOW = time.localtime()
+        STATE = GARBAGE_SCHEDULE.index((LOCALNOW.tm_wday + 1) % 7,
+                                       LOCALNOW.tm_hour, LOCALNOW.tm_min)
+    else:
+        # Power was lost and the RTC restarted; best guess until the first
+        # sync attempt is the last synced time and schedule state, which
+        # may be hours or days old, so a failed sync replaces it with ???
+        RTC().datetime = time.localtime(SAVED[0])
+        LOCALNOW = time.localtime()
+        STATE = SAVED[4]
+    WEEKDAY, GARBAGEDAY, COLOR, HCOLOR = GARBAGE_SCHEDULE.states[STATE]
+    show_frame(LOCALNOW, WEEKDAY, GARBAGEDAY, COLOR, HCOLOR)
+
 NETWORK = Network(status_neopixel=board.NEOPIXEL, debug=False)
 NETWORK.connect()
 
@@ -231,17 +271,50 @@ try:
 except:
     TIMEZONE = None # IP geolocation
 
+# URL, key header and HTTP session are set up once and reused every sync
+TIME_CLIENT = TimeClient(adafruit_requests, secrets['aio_username'],
+                         secrets['aio_key'], TIMEZONE)
+if TIME_SOURCE == 'ntp':
+    # The ESP32 keeps NTP time itself once on WiFi; the offset is ours to add
+    ESP = NETWORK._wifi.esp # pylint: disable=protected-access
+    TIME_SOURCES = (NtpTimeSource(lambda: ESP.get_time()[0],
+                                  secrets.get('utc_offset', 0),
+                                  secrets.get('dst')), TIME_CLIENT)
+else:
+    TIME_SOURCES = (TIME_CLIENT,)
+if DEMO:
+    # Fast-forward a consistent calendar, stopping at every schedule change
+    TIME_SOURCES = (DemoClock(DEMO_START, DEMO_SPEED, GARBAGE_SCHEDULE),)
+
 # Set initial clock time
 # pylint: disable=bare-except
-demo_num = 0
-LAST_SYNC = 0
-demo_hour = str(random.randint(6,20))
-repeatDayCount = 0
+NEXT_SYNC = 0 # RTC time the next time server sync is due
+TICKER = TickScheduler(NIGHT_START, NIGHT_END)
 
 # MAIN LOOP ----------------------------------------------------------------
 
+HEAP = HeapMeter(LOG if LOG_LEVEL // INFO else None)
+GC = GcPolicy(GC_MIN_FREE, LOG if LOG_LEVEL // DEBUG else None)
+PROFILER.mark()
+
 while True:
-    gc.collect()
+    COMMAND = serial_command()
+    if COMMAND == 'p':
+        PROFILER.summary()
+        HEAP.summary()
+        GC.summary()
+        print('glyphs not preloaded: %r' % ''.join(
+            [chr(c) for c in LARGE_FONT.misses + SMALL_FONT.misses]))
+        PROFILER.mark() # Don't charge the printing to a phase
+    elif COMMAND == 'r':
+        PROFILER.reset()
+    elif COMMAND == 'l' and LOG:
+        LOG.drain()
+    elif COMMAND == 't' and TRACE:
+        TRACE.dump()
+        PROFILER.mark()
+
+    HEAP.start()
     NOW = time.time() # Current epoch time in seconds
     LOCALNOW = time.localtime() # local time
 
@@ -252,123 +325,91 @@ while True:
     #    print("button up pressed")
     #--DOES NOT WORK ABOVE--
 
-    # Sync with time server every ~5 minutes - the clock drifts if left too long
+    # Sync with time server every DRIFT.interval seconds - starts at 10 minutes
+    # and stretches out as long as the RTC keeps close to server time
     if DEMO == False:
-        if LAST_SYNC == 0:
+        if NOW >= NEXT_SYNC:
+            SYNC_START = time.monotonic_ns()
             try:
-                DATETIME, WEEKDAY, GARBAGEDAY, COLOR, HCOLOR = update_time(TIMEZONE)
-            except:
-                DATETIME, WEEKDAY, GARBAGEDAY, COLOR, HCOLOR = time.localtime(), "???", "???", "grey", 0x66666
-            LAST_SYNC = time.mktime(DATETIME)
-        # elif NOW - LAST_SYNC > 60*5:
-        elif NOW - LAST_SYNC > 600:
-            try:
-                DATETIME, WEEKDAY, GARBAGEDAY, COLOR, HCOLOR = update_time(TIMEZONE)
-                LAST_SYNC = time.mktime(DATETIME)
-                continue # Time may have changed; refresh NOW value
+                DATETIME = sync_rtc(TIME_SOURCES, RTC(), DRIFT,
+                                    LOG if LOG_LEVEL // DEBUG else None)
+                TIME_VALID = True
+                # Sync again at the end of the night if that's sooner, in
+                # case the clocks changed while the display was off
+                NEXT_SYNC = min(time.mktime(DATETIME) + DRIFT.interval,
+                                TICKER.morning(time.mktime(DATETIME), DATETIME))
+                SYNC_RETRY.succeeded()
+                TICKER.reset()
+                STATE = GARBAGE_SCHEDULE.index(DATETIME.tm_wday,
+                                               DATETIME.tm_hour,
+                                               DATETIME.tm_min)
+                WEEKDAY, GARBAGEDAY, COLOR, HCOLOR = GARBAGE_SCHEDULE.states[STATE]
+                SYNCED = True
+                if LOG_LEVEL // INFO:
+                    LOG.info('synced, next in %d s, drift %d ppm',
+                             DRIFT.interval, DRIFT.rate_ppm)
             except Exception as e:
-                # update_time() can throw an exception if time server doesn't
+                # sync_rtc() can throw an exception if time server doesn't
                 # respond. That's OK, keep running with our current time, and
-                # push sync time ahead to retry in 30 minutes (don't overwhelm
-                # the server with repeated queries).
-                sys.print_exception(e)
-                # LAST_SYNC += 60 * 5 # 5 minutes
-                LAST_SYNC += 60 # 1 minute
-                continue
-    elif DEMO == True:
-        # normal demo mode start
-        if NOW - LAST_SYNC > 5 or LAST_SYNC == 0: #increment every 10 seconds
-            if demo_num == 2 or demo_num == 3: # on Tuesday and Wednesday
-                if repeatDayCount == 0:
-                    demo_hour="7" #set demo hour to 7AM to show first half of the day
-                    repeatDayCount += 1 #will repeat the day
-                elif repeatDayCount == 1:
-                    demo_hour="19" #set demo hour to 7PM to show second half of the day
-                    repeatDayCount = 0 #reset repeatDayCount to 0 to move to next day
-        # normal demo mode end
-        #
-        # special time demo mode start
-        # uncomment this and comment normal demo move (above)to test night mode
-        # or to test other states requiring specific times
-        # if NOW - LAST_SYNC > 5 or LAST_SYNC == 0: #increment every 10 seconds
-        #     if demo_hour == "7":
-        #         demo_hour = "22"
-        #     elif demo_hour == "22":
-        #         demo_hour = "7"
-        # special time demo mode end
-        # uncomment to here
-        #
-            DATETIME, WEEKDAY, GARBAGEDAY, COLOR, HCOLOR = update_time(TIMEZONE, demo_num, demo_hour)
-            if repeatDayCount == 0: # increment the day if it's not repeating
-                if demo_num < 6:
-                    demo_num += 1
-                else:
-                    demo_num = 0
-            # demo_hour = str(random.randint(6,20)) # will not show night mode
-            demo_hour = str(random.randint(0,23)) # will occasionally show night mode
-            LAST_SYNC = time.mktime(DATETIME)
+                # let SYNC_RETRY push the next try out (don't overwhelm the
+                # server with repeated queries).
+                if not TIME_VALID: # RTC time is meaningless or stale
+                    DATETIME, WEEKDAY, GARBAGEDAY, COLOR, HCOLOR = time.localtime(), "???", "???", "grey", 0x66666
+                    STATE = -1
+                NEXT_SYNC = time.time() + SYNC_RETRY.failed()
+                SYNCED = False
+                if LOG_LEVEL // ERROR:
+                    LOG.error('sync failed: %r, retry in %d s', e,
+                              SYNC_RETRY.last_delay)
+            if SYNCED: # Outside the try, so a bad write isn't a failed sync
+                CHECKPOINT.save(time.mktime(DATETIME), DRIFT, STATE)
+            if TRACE:
+                TRACE.record(time.time(), SYNC_OK if SYNCED else SYNC_FAILED,
+                             (time.monotonic_ns() - SYNC_START) // 1000000,
+                             STATE, gc.mem_free())
+            GC.note('sync')
+            PROFILER.lap(SYNC)
             continue # Time may have changed; refresh NOW value
-
-    # Don't draw anything from 10pm to 6am (this thing is BRIGHT)
-    # if (DATETIME.tm_hour >= 22 and DATETIME.tm_min >= 0) or (DATETIME.tm_hour <= 6):
-    if (DATETIME.tm_hour >= 22 and DATETIME.tm_min >= 0) or (DATETIME.tm_hour <=5 and DATETIME.tm_min >= 0):
-        DISPLAY.show(empty_group)
-    # If it's not night, use normal daytime colors
-    else:
-        # Sets the display orientation based on whether the board is horizontal or vertical
-        if DISPLAY.rotation in (0, 180): # Horizontal 'landscape' orientation
-            CENTER_X = 48  # Text along right
-            TRASH_Y = 0     # Garbage at left
-            TIME_Y = 5     # Time at top right
-            EVENT_Y = 25   # Day of week at bottom right
-        else:              # Vertical 'portrait' orientation
-            CENTER_X = 16  # Text down center
-            TIME_Y = 6     # Time/date at top
-            EVENT_Y = 26   # Day of week in middle
-            TRASH_Y = 32    # Garbage at bottom
-        DISPLAY.show(GROUP)
-        # Update trash can image (GROUP[0])
-        FILENAME = 'bmps/garbage_can_' + COLOR + '.bmp'
-        BITMAP = displayio.OnDiskBitmap(open(FILENAME, 'rb'))
-        TILE_GRID = displayio.TileGrid(BITMAP,
-                                       pixel_shader=displayio.ColorConverter(),)
-        TILE_GRID.x = 0
-        TILE_GRID.y = TRASH_Y
-
-        GROUP[0] = TILE_GRID
-
-        # Set element 5 first, use its size and position for setting others
-        #GROUP[5].text is the text over the image
-        GROUP[5].text = GARBAGEDAY
-        GROUP[5].color = HCOLOR
-        GROUP[5].x = 16 - GROUP[5].bounding_box[2] // 2
-        GROUP[5].y = TRASH_Y + 15
-        for _ in range(1, 5):
-            GROUP[_].text = GROUP[5].text
-        GROUP[1].x, GROUP[1].y = GROUP[5].x, GROUP[5].y - 1 # Up 1 pixel
-        GROUP[2].x, GROUP[2].y = GROUP[5].x - 1, GROUP[5].y # Left
-        GROUP[3].x, GROUP[3].y = GROUP[5].x + 1, GROUP[5].y # Right
-        GROUP[4].x, GROUP[4].y = GROUP[5].x, GROUP[5].y + 1 # Down
-
-        # GROUP[8] is day of week
-        GROUP[8].text = WEEKDAY + "   "
-        XPOS = CENTER_X - (GROUP[8].bounding_box[2] + 6) // 2
-        GROUP[8].x = XPOS + 6
-        GROUP[8].y = EVENT_Y
-        # Show weekday in color matching trash color
-        GROUP[8].color = HCOLOR
-
-        # Update time (GROUP[6]) and date (GROUP[7])
-        # GROUP[6] is the time
-        GROUP[6].text = hh_mm(LOCALNOW)
-        # Show time in orange if AM, blue if PM
-        GROUP[6].color = (0xFF6600 if DATETIME.tm_hour < 12 else 0x3300CC)
-        GROUP[6].x = CENTER_X - GROUP[6].bounding_box[2] // 2
-        GROUP[6].y = TIME_Y
-        # GRYOUP[7] is the date
-        GROUP[7].text = str(LOCALNOW.tm_mon) + '.' + str(LOCALNOW.tm_mday)
-        GROUP[7].x = CENTER_X - GROUP[7].bounding_box[2] // 2
-        GROUP[7].y = TIME_Y + 10
-
-    DISPLAY.refresh() # Force full repaint (splash screen sometimes sticks)
-    time.sleep(5)
+    elif NOW >= NEXT_SYNC:
+        # Demo: set the RTC to the next step of the demo clock
+        DATETIME = sync_rtc(TIME_SOURCES, RTC(), None,
+                            LOG if LOG_LEVEL // DEBUG else None)
+        TIME_VALID = True
+        NEXT_SYNC = time.mktime(DATETIME) + DEMO_STEP
+        STATE = GARBAGE_SCHEDULE.index(DATETIME.tm_wday, DATETIME.tm_hour,
+                                       DATETIME.tm_min)
+        WEEKDAY, GARBAGEDAY, COLOR, HCOLOR = GARBAGE_SCHEDULE.states[STATE]
+        if TRACE:
+            TRACE.record(time.time(), SYNC_OK, 0, STATE, gc.mem_free())
+        if LOG_LEVEL // DEBUG:
+            LOG.debug('demo step %d', TIME_SOURCES[0].steps)
+        TICKER.reset() # No GC.note(): a demo step is cheap and comes every second
+        PROFILER.lap(SYNC)
+        continue # Time may have changed; refresh NOW value
+
+    if TIME_VALID:
+        # Follow the schedule minute by minute between syncs
+        STATE = GARBAGE_SCHEDULE.index((LOCALNOW.tm_wday + 1) % 7,
+                                       LOCALNOW.tm_hour, LOCALNOW.tm_min)
+        WEEKDAY, GARBAGEDAY, COLOR, HCOLOR = GARBAGE_SCHEDULE.states[STATE]
+    PROFILER.lap(CLASSIFY)
+
+    SWAPS = RENDERER.swaps
+    REFRESHES = RENDERER.refreshes
+    show_frame(LOCALNOW, WEEKDAY, GARBAGEDAY, COLOR, HCOLOR)
+    HEAP.stop()
+    if TRACE:
+        TRACE.record(NOW, REFRESHED if RENDERER.refreshes != REFRESHES else 0,
+                     0, STATE, gc.mem_free())
+    if RENDERER.swaps != SWAPS:
+        GC.note('bitmap')
+    if SPLASH_FILE and RENDERER.swaps: # Start image is off the display
+        SPLASH_FILE.close()
+        SPLASH_FILE = None
+    if GC.check(): # Before sleeping, so any pause is off the render path
+        PROFILER.lap(COLLECT)
+
+    # Sleep until something visible can change or the next sync is due
+    TICKER.sleep_until(TICKER.next_deadline(NOW, LOCALNOW, NEXT_SYNC,
+                                            GARBAGE_SCHEDULE if TIME_VALID else None))
+    PROFILER.lap(SLEEP)
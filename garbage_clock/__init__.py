@@ -0,0 +1,8 @@
+"""
+The reusable parts of the GARBAGE CLOCK: time sources and time keeping,
+the pickup schedule, text formatting, layout and rendering. code.py
+(garbageClockAIO.py) holds the settings, sets up the hardware and runs the
+main loop. Copy this folder to /lib on the board, ideally compiled with
+mpy-cross by mpybuild.py, which imports faster and needs less RAM than
+compiling the source at every boot.
+"""
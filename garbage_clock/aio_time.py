@@ -0,0 +1,243 @@
+"""
+AdafruitIO time helpers for the GARBAGE CLOCK. Kept free of any board
+specific imports so they can also be run and benchmarked under CPython.
+
+AdafruitIO /integrations/time/struct/ response example:
+{"year":2021,"mon":1,"mday":2,"hour":17,"min":22,"sec":25,"wday":6,"yday":2,"isdst":0}
+"""
+
+import time
+
+# Keys of the struct response, in time.struct_time order
+STRUCT_KEYS = (b'year', b'mon', b'mday', b'hour', b'min', b'sec', b'wday',
+               b'yday', b'isdst')
+
+QUOTE = 0x22 # "
+COLON = 0x3A # :
+MINUS = 0x2D # -
+ZERO = 0x30  # 0
+NINE = 0x39  # 9
+
+
+def key_index(data, start, end):
+    """ Index in STRUCT_KEYS of the key in data[start:end], or -1. Compares
+        byte by byte so no slice is allocated.
+    """
+    length = end - start
+    for index in range(len(STRUCT_KEYS)):
+        key = STRUCT_KEYS[index]
+        if len(key) != length:
+            continue
+        for i in range(length):
+            if data[start + i] != key[i]:
+                break
+        else:
+            return index
+    return -1
+
+
+def parse_time_struct(data, fields):
+    """ Parse an AdafruitIO time struct response straight from its bytes
+        into fields, a preallocated list of 9 ints in time.struct_time
+        order, without building a str or dict. Raises ValueError if any
+        field is missing. Returns fields.
+    """
+    found = 0
+    size = len(data)
+    i = 0
+    while i < size:
+        if data[i] != QUOTE:
+            i += 1
+            continue
+        start = i + 1
+        end = start
+        while end < size and data[end] != QUOTE:
+            end += 1
+        index = key_index(data, start, end)
+        i = end + 1
+        if index < 0:
+            continue
+        while i < size and data[i] != COLON:
+            i += 1
+        i += 1
+        while i < size and data[i] == 0x20: # Skip spaces
+            i += 1
+        sign = 1
+        if i < size and data[i] == MINUS:
+            sign = -1
+            i += 1
+        value = 0
+        digits = 0
+        while i < size and ZERO <= data[i] <= NINE:
+            value = value * 10 + data[i] - ZERO
+            digits += 1
+            i += 1
+        if digits:
+            fields[index] = sign * value
+            found |= 1 << index
+    if found != (1 << len(STRUCT_KEYS)) - 1:
+        raise ValueError('incomplete time struct')
+    return fields
+
+
+class TimeClient:
+    """ Fetches the time from AdafruitIO's struct integration. The URL and
+        headers are built once; the key goes in an X-AIO-Key header rather
+        than the query string. requests is an adafruit_requests session (or
+        the module, once set_socket() has been called), whose socket stays
+        open between syncs when the coprocessor allows, so later syncs skip
+        the DNS lookup and connection setup. Latency of each fetch is kept
+        in last_ms, min_ms, max_ms and total_ms over syncs fetches.
+    """
+    def __init__(self, requests, username, key, timezone=None, timeout=10):
+        self.requests = requests
+        self.url = ('https://io.adafruit.com/api/v2/' + username +
+                    '/integrations/time/struct/')
+        if timezone: # Else AdafruitIO uses IP geolocation
+            self.url += '?tz=' + timezone
+        self.headers = {'X-AIO-Key': key}
+        self.timeout = timeout
+        self.fields = [0] * 9 # Last response, in time.struct_time order
+        self.syncs = 0
+        self.last_ms = 0
+        self.min_ms = 0
+        self.max_ms = 0
+        self.total_ms = 0
+
+    def fetch(self):
+        """ Fetch the current local time. Returns self.fields, updated in
+            place. Raises on network errors or an unexpected response.
+        """
+        start = time.monotonic_ns()
+        response = self.requests.get(self.url, headers=self.headers,
+                                     timeout=self.timeout)
+        try:
+            if response.status_code != 200:
+                raise RuntimeError('time server returned %d' %
+                                   response.status_code)
+            parse_time_struct(response.content, self.fields)
+        finally:
+            response.close() # Hands the socket back for the next sync
+        elapsed = (time.monotonic_ns() - start) // 1000000
+        self.last_ms = elapsed
+        self.min_ms = min(self.min_ms, elapsed) if self.syncs else elapsed
+        self.max_ms = max(self.max_ms, elapsed)
+        self.total_ms += elapsed
+        self.syncs += 1
+        return self.fields
+
+
+# Some boards' time module has no gmtime(); with no timezone set there,
+# localtime() is UTC anyway
+gmtime = getattr(time, 'gmtime', time.localtime)
+
+
+def days_from_civil(year, month, day):
+    """ Days from 1970-01-01 to the given date (proleptic Gregorian). """
+    if month <= 2:
+        year -= 1
+        month += 9
+    else:
+        month -= 3
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_era = (year_of_era * 365 + year_of_era // 4 - year_of_era // 100 +
+                  (153 * month + 2) // 5 + day - 1)
+    return era * 146097 + day_of_era - 719468
+
+
+def sunday_on_or_before(days):
+    """ Day number of the Sunday on or before a day number. """
+    return days - (days + 4) % 7 # 1970-01-01 was a Thursday
+
+
+def dst_bounds(year, rule, utc_offset):
+    """ UTC epoch seconds (start, end) of daylight saving time in a year.
+        rule is 'us' (2nd Sunday in March to 1st Sunday in November, at
+        2am local) or 'eu' (last Sunday in March to last Sunday in October,
+        at 1am UTC). utc_offset is standard time's offset in seconds.
+    """
+    if rule == 'us':
+        start = sunday_on_or_before(days_from_civil(year, 3, 14))
+        end = sunday_on_or_before(days_from_civil(year, 11, 7))
+        return (start * 86400 + 7200 - utc_offset,
+                end * 86400 + 3600 - utc_offset)
+    if rule == 'eu':
+        start = sunday_on_or_before(days_from_civil(year, 3, 31))
+        end = sunday_on_or_before(days_from_civil(year, 10, 31))
+        return start * 86400 + 3600, end * 86400 + 3600
+    raise ValueError('unknown DST rule ' + rule)
+
+
+class NtpTimeSource:
+    """ Gets UTC from NTP and converts it to local time on the device, so
+        the clock needn't do an HTTPS request and JSON decode just to learn
+        nine numbers. get_utc returns UTC epoch seconds: on the Matrix
+        Portal that's lambda: esp.get_time()[0], where the ESP32
+        coprocessor has already synced with NTP after joining WiFi; under
+        CPython any NTP client works. utc_offset is standard time's offset
+        in hours, dst an optional 'us' or 'eu' rule (see dst_bounds()).
+        Same fetch() and latency attributes as TimeClient.
+    """
+    def __init__(self, get_utc, utc_offset=0, dst=None):
+        self.get_utc = get_utc
+        self.utc_offset = int(utc_offset * 3600)
+        self.dst = dst
+        self.dst_year = None
+        self.dst_start = self.dst_end = 0
+        self.fields = [0] * 9
+        self.syncs = 0
+        self.last_ms = 0
+        self.min_ms = 0
+        self.max_ms = 0
+        self.total_ms = 0
+
+    def fetch(self):
+        """ Fetch the current local time. Returns self.fields, updated in
+            place, in the same order and conventions as the AdafruitIO
+            struct (wday 0 is Sunday).
+        """
+        start = time.monotonic_ns()
+        utc = self.get_utc()
+        offset = self.utc_offset
+        isdst = 0
+        if self.dst:
+            year = gmtime(utc + offset).tm_year
+            if year != self.dst_year:
+                self.dst_start, self.dst_end = dst_bounds(year, self.dst,
+                                                          offset)
+                self.dst_year = year
+            if self.dst_start <= utc < self.dst_end:
+                offset += 3600
+                isdst = 1
+        now = gmtime(utc + offset)
+        fields = self.fields
+        fields[0] = now.tm_year
+        fields[1] = now.tm_mon
+        fields[2] = now.tm_mday
+        fields[3] = now.tm_hour
+        fields[4] = now.tm_min
+        fields[5] = now.tm_sec
+        fields[6] = (now.tm_wday + 1) % 7 # struct_time's week starts Monday
+        fields[7] = now.tm_yday
+        fields[8] = isdst
+        elapsed = (time.monotonic_ns() - start) // 1000000
+        self.last_ms = elapsed
+        self.min_ms = min(self.min_ms, elapsed) if self.syncs else elapsed
+        self.max_ms = max(self.max_ms, elapsed)
+        self.total_ms += elapsed
+        self.syncs += 1
+        return fields
+
+
+def fetch_first(sources):
+    """ fetch() from each time source in turn and return the first result.
+        If they all fail, the last source's exception is raised.
+    """
+    error = None
+    for source in sources:
+        try:
+            return source.fetch()
+        except Exception as e: # pylint: disable=broad-except
+            error = e
+    raise error
@@ -0,0 +1,50 @@
+"""
+Demo mode for the GARBAGE CLOCK: a made-up calendar that runs fast, so the
+whole week of garbage states goes by in a few minutes.
+"""
+
+import time
+from .aio_time import NtpTimeSource, gmtime
+
+
+class DemoClock:
+    """ Stands in for the time sources in DEMO mode. Demo time starts at
+        start (local epoch seconds) and runs speed times faster than
+        time.monotonic_ns() (3600 is an hour a second), so dates and
+        weekdays always agree. A step never runs past the next transition
+        of schedule (a ScheduleTable): it stops right on it, so every
+        state is shown, in order, however fast the demo runs. fetch()
+        returns the same fields as the other time sources.
+    """
+    def __init__(self, start, speed, schedule=None):
+        self.now = start
+        self.speed = speed
+        self.schedule = schedule
+        self.last_ns = None
+        self.source = NtpTimeSource(self.time) # Fills in the fields
+        self.steps = 0
+
+    def time(self):
+        """ Current demo time, local epoch seconds. """
+        return self.now
+
+    def advance(self):
+        """ Move demo time on by the time passed since the last step. """
+        now_ns = time.monotonic_ns()
+        if self.last_ns is not None:
+            step = (now_ns - self.last_ns) * self.speed // 1000000000
+            if self.schedule:
+                local = gmtime(self.now)
+                step = min(step, self.schedule.minutes_to_next(
+                    (local.tm_wday + 1) % 7, local.tm_hour,
+                    local.tm_min) * 60 - local.tm_sec)
+            self.now += step
+            self.steps += 1
+        self.last_ns = now_ns
+
+    def fetch(self):
+        """ Advance and return the time as TimeClient.fetch() does, in a
+            list updated in place (wday 0 is Sunday).
+        """
+        self.advance()
+        return self.source.fetch()
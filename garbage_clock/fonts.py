@@ -0,0 +1,73 @@
+"""
+Font loading for the GARBAGE CLOCK: packed fonts when available, BDF
+otherwise, with every glyph the clock shows loaded up front, and the list
+of those glyphs (clock_chars(), which fontpack.py also uses under CPython).
+"""
+
+try:
+    from adafruit_bitmap_font import bitmap_font
+except ImportError: # CPython, for fontpack.py
+    bitmap_font = None
+from .packed_font import PackedFont
+from .schedule import WEEKDAY_NAMES
+
+
+class PreloadedFont:
+    """ Wraps a bitmap font after load_glyphs(chars), passing everything
+        through but noting any glyph asked for that wasn't preloaded (the
+        BDF parser then runs mid-render, which stalls and fragments the
+        heap). Misses are kept in misses, and logged once each at info level
+        if log (a RingLog) is given. Characters of chars the font has no
+        glyph for (e.g. a .gfa packed with too few) are kept in missing and
+        count as misses when drawn, rather than silently drawing blank.
+    """
+    def __init__(self, font, chars, log=None):
+        font.load_glyphs(chars)
+        self.font = font
+        self.log = log
+        self.missing = ''.join([c for c in chars
+                                if font.get_glyph(ord(c)) is None])
+        self.loaded = set(ord(c) for c in chars if c not in self.missing)
+        self.misses = []
+
+    def get_glyph(self, code_point):
+        if code_point not in self.loaded:
+            self.loaded.add(code_point)
+            self.misses.append(code_point)
+            if self.log:
+                self.log.info('glyph not preloaded: %r', chr(code_point))
+        return self.font.get_glyph(code_point)
+
+    def __getattr__(self, name):
+        return getattr(self.font, name)
+
+
+def load_font(name):
+    """ Load /fonts/<name>.gfa if it's there (packed by fontpack.py, much
+        quicker to load), else /fonts/<name>.bdf.
+    """
+    try:
+        return PackedFont('/fonts/' + name + '.gfa')
+    except OSError:
+        return bitmap_font.load_font('/fonts/' + name + '.bdf')
+
+
+def charset(*strings):
+    """ The distinct characters in all of strings, as one sorted string. """
+    chars = set()
+    for string in strings:
+        chars.update(string)
+    return ''.join(sorted(chars))
+
+
+def clock_chars(formatter, schedule, texts):
+    """ (large, small): every character the clock can draw in its large
+        font (times from formatter, a TextFormatter) and its small font
+        (formatter's dates, weekdays, the text of the states of schedule,
+        a ScheduleTable, and the other texts shown).
+    """
+    return (charset(*(formatter.hours + formatter.minutes)),
+            # December's days have every digit a date can
+            charset(*[formatter.date(12, day) for day in range(1, 32)] +
+                    [formatter.weekday(name) for name in WEEKDAY_NAMES] +
+                    [state[1] for state in schedule.states] + list(texts)))
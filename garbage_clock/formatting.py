@@ -0,0 +1,69 @@
+"""
+Text shown on the GARBAGE CLOCK face: time, date and day of week.
+"""
+
+from .schedule import WEEKDAY_NAMES
+
+
+def hour_string(hour, twelve_hour=True):
+    """ Hour part of hh_mm(): H or HH in 12-hour style, or HH in 24-hour
+        style.
+    """
+    if twelve_hour:
+        if hour > 12:
+            return str(hour - 12) # 13-23 -> 1-11 (pm)
+        elif hour > 0:
+            return str(hour) # 1-12
+        return '12' # 0 -> 12 (am)
+    return '{0:0>2}'.format(hour)
+
+
+def hh_mm(time_struct, twelve_hour=True):
+    """ Given a time.struct_time, return a string as H:MM or HH:MM, either
+        12- or 24-hour style.
+    """
+    return (hour_string(time_struct.tm_hour, twelve_hour) + ':' +
+            '{0:0>2}'.format(time_struct.tm_min))
+
+
+class TextFormatter:
+    """ Strings for the clock face without allocating in steady state. Hour
+        and minute parts come from tables built at boot, and each string is
+        only rebuilt when its value changes; otherwise the previous string
+        object is returned, which also lets FrameRenderer skip it.
+    """
+    def __init__(self, twelve_hour=True):
+        self.hours = tuple([hour_string(hour, twelve_hour)
+                            for hour in range(24)])
+        self.minutes = tuple([':{0:0>2}'.format(minute) for minute in range(60)])
+        # Day of week is padded to leave room on its left (see Layout)
+        self.padded = {}
+        for name in WEEKDAY_NAMES + ("???",):
+            self.padded[name] = name + "   "
+        self.time_key = -1
+        self.time_text = ''
+        self.date_key = -1
+        self.date_text = ''
+
+    def time(self, hour, minute):
+        """ Same as hh_mm() for the given hour and minute. """
+        key = hour * 60 + minute
+        if key != self.time_key:
+            self.time_text = self.hours[hour] + self.minutes[minute]
+            self.time_key = key
+        return self.time_text
+
+    def date(self, month, day):
+        """ Date as M.D """
+        key = month * 32 + day
+        if key != self.date_key:
+            self.date_text = str(month) + '.' + str(day)
+            self.date_key = key
+        return self.date_text
+
+    def weekday(self, name):
+        """ Day of week name padded for display. """
+        padded = self.padded.get(name)
+        if padded is None:
+            padded = self.padded[name] = name + "   "
+        return padded
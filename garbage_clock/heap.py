@@ -0,0 +1,96 @@
+"""
+Heap housekeeping for the GARBAGE CLOCK: when to collect garbage, and how
+much each trip around the main loop allocates.
+"""
+
+import gc
+import time
+
+
+class GcPolicy:
+    """ Collects garbage only when it helps: when free heap drops below
+        min_free, or after events known to leave a lot of garbage behind
+        (note() them: a time sync, a bitmap swap). Also sets gc.threshold()
+        where supported so the VM collects by itself before the heap gets
+        fragmented. Keeps the number of collections, total and longest
+        pause in ms and the lowest free heap seen. Collections are logged
+        at debug level if log (a RingLog) is given.
+    """
+    def __init__(self, min_free, log=None):
+        self.min_free = min_free
+        self.log = log
+        self.pending = None # Event waiting to be collected after
+        self.collections = 0
+        self.pause_ms = 0
+        self.max_pause_ms = 0
+        self.low_water = gc.mem_free()
+        try: # Automatic collection after a quarter of free heap is used
+            gc.threshold(gc.mem_free() // 4)
+        except AttributeError:
+            pass
+
+    def note(self, event):
+        """ Note an allocation-heavy event so the next check collects. """
+        self.pending = event
+
+    def check(self):
+        """ Collect if needed. Best called when there's idle time ahead. """
+        free = gc.mem_free()
+        if free < self.low_water:
+            self.low_water = free
+        if self.pending is None and free >= self.min_free:
+            return False
+        start = time.monotonic_ns()
+        gc.collect()
+        pause = (time.monotonic_ns() - start) // 1000000
+        if self.log:
+            self.log.debug('gc after %s: %d ms, %d bytes free', self.pending,
+                           pause, gc.mem_free())
+        self.pending = None
+        self.collections += 1
+        self.pause_ms += pause
+        self.max_pause_ms = max(self.max_pause_ms, pause)
+        return True
+
+    def summary(self):
+        print('gc: %d collections, %d ms in all, longest %d ms, lowest free '
+              'heap %d bytes' % (self.collections, self.pause_ms,
+                                 self.max_pause_ms, self.low_water))
+
+
+class HeapMeter:
+    """ Bytes allocated per main loop iteration, from gc.mem_alloc() deltas.
+        An iteration during which the heap filled and garbage was collected
+        comes out negative and isn't counted. Logs at info level, if log (a
+        RingLog) is given, whenever an iteration allocates more than any
+        before it, so a regression shows up right away. last, peak, total
+        and iterations can be read any time, and summary() prints them.
+    """
+    def __init__(self, log=None):
+        self.log = log
+        self.base = 0
+        self.last = 0
+        self.peak = 0
+        self.total = 0
+        self.iterations = 0
+
+    def start(self):
+        self.base = gc.mem_alloc()
+
+    def stop(self):
+        self.last = gc.mem_alloc() - self.base
+        if self.last < 0: # Collected in between, delta means nothing
+            return
+        self.total += self.last
+        self.iterations += 1
+        if self.last > self.peak:
+            self.peak = self.last
+            if self.log:
+                self.log.info('heap: iteration %d allocated %d bytes '
+                              '(new peak)', self.iterations, self.last)
+
+    def summary(self):
+        print('heap: %d bytes allocated last iteration, peak %d, mean %d '
+              'over %d' % (self.last, self.peak,
+                           self.total // max(self.iterations, 1),
+                           self.iterations))
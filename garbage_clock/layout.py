@@ -0,0 +1,86 @@
+"""
+Where each element of the GARBAGE CLOCK face goes, for any panel size and
+rotation.
+"""
+
+
+class Layout:
+    """ Positions of the display elements for any panel size and rotation.
+        Landscape panels put the garbage can at the left and text centered
+        in the space to its right; portrait panels put text at the top and
+        the can at the bottom. Each element's anchor (center x, y) is worked
+        out once per rotation, text widths come from per-font tables of
+        glyph advances, and each (rotation, element, width) -> (x, y) is
+        cached, so placing an element is a few lookups.
+    """
+    # Element name -> extra left padding folded into centering (the day of
+    # week leaves room for an icon, as on the moon clock)
+    PADDING = {'can': 0, 'garbage': 0, 'time': 0, 'date': 0, 'weekday': 6}
+
+    def __init__(self, display, can_width=32, can_height=32):
+        self.display = display
+        self.can_width = can_width
+        self.can_height = can_height
+        self.anchors = {}   # rotation -> element -> (center x or x, y)
+        self.positions = {} # (rotation, element, text width) -> (x, y)
+        self.metrics = {}   # font -> code point -> (advance, right extent)
+
+    def anchors_for(self, width, height):
+        """ Element anchors for a panel width x height pixels as rotated. """
+        can_w, can_h = self.can_width, self.can_height
+        if width >= height: # Horizontal 'landscape' orientation
+            can_x, can_y = 0, (height - can_h) // 2 # Garbage at left
+            center_x = can_w + (width - can_w) // 2 # Text along right
+            time_y = 5                              # Time at top right
+            event_y = height - 7                    # Day of week at bottom
+        else:               # Vertical 'portrait' orientation
+            can_x, can_y = (width - can_w) // 2, height - can_h # At bottom
+            center_x = width // 2                   # Text down center
+            time_y = 6                              # Time/date at top
+            event_y = height - can_h - 6            # Day of week in middle
+        return {'can': (can_x, can_y),
+                'garbage': (can_x + can_w // 2, can_y + can_h // 2 - 1),
+                'time': (center_x, time_y),
+                'date': (center_x, time_y + 10),
+                'weekday': (center_x, event_y)}
+
+    def text_width(self, font, text):
+        """ Width in pixels of text in font, from cached glyph metrics. """
+        metrics = self.metrics.get(font)
+        if metrics is None:
+            metrics = self.metrics[font] = {}
+        pen_x = right = 0
+        for char in text:
+            code_point = ord(char)
+            metric = metrics.get(code_point)
+            if metric is None:
+                glyph = font.get_glyph(code_point)
+                if glyph:
+                    metric = (glyph.shift_x,
+                              max(glyph.shift_x, glyph.dx + glyph.width))
+                else:
+                    metric = (0, 0)
+                metrics[code_point] = metric
+            right = max(right, pen_x + metric[1])
+            pen_x += metric[0]
+        return right
+
+    def place(self, element, font=None, text=None):
+        """ (x, y) for element showing text in font (just the anchor for
+            the can, which has no text).
+        """
+        rotation = self.display.rotation
+        width = self.text_width(font, text) if font else 0
+        key = (rotation, element, width)
+        position = self.positions.get(key)
+        if position is None:
+            anchors = self.anchors.get(rotation)
+            if anchors is None:
+                anchors = self.anchors[rotation] = self.anchors_for(
+                    self.display.width, self.display.height)
+            x, y = anchors[element]
+            if font:
+                pad = self.PADDING[element]
+                x -= (width + pad) // 2 - pad
+            position = self.positions[key] = (x, y)
+        return position
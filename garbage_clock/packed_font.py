@@ -0,0 +1,67 @@
+"""
+Loader for the GARBAGE CLOCK's packed bitmap fonts (.gfa glyph atlases
+made from BDF files by fontpack.py). A packed font is read with three bulk
+reads into buffers sized from its header, instead of parsing BDF text line
+by line at every boot, and holds only the glyphs the clock uses.
+
+File layout (little endian):
+  header  magic 'GFA1', glyph count (H), font bounding box width, height
+          (B, B), x and y offset (b, b), bitmap data size (H)
+  table   per glyph: code point (H), width, height (B, B), dx, dy,
+          shift_x (b, b, b), pad, offset into bitmap data (H)
+  data    per glyph: rows of (width + 7) // 8 bytes, high bit leftmost
+"""
+
+# pylint: disable=import-error
+import struct
+
+MAGIC = b'GFA1'
+HEADER = '<4sHBBbbH'
+RECORD = '<HBBbbbxH'
+HEADER_SIZE = struct.calcsize(HEADER)
+RECORD_SIZE = struct.calcsize(RECORD)
+
+
+class PackedFont:
+    """ A font loaded from a .gfa file, usable anywhere a font from
+        adafruit_bitmap_font is (labels, OutlinedText, PreloadedFont). All
+        glyphs are unpacked into displayio.Bitmaps at load time, so
+        load_glyphs() has nothing left to do.
+    """
+    def __init__(self, path):
+        import displayio # Only needed on the board
+        from fontio import Glyph
+        header = bytearray(HEADER_SIZE)
+        with open(path, 'rb') as file:
+            file.readinto(header)
+            magic, count, width, height, dx, dy, size = struct.unpack(HEADER,
+                                                                      header)
+            if magic != MAGIC:
+                raise ValueError(path + ' is not a packed font')
+            table = bytearray(count * RECORD_SIZE)
+            file.readinto(table)
+            data = bytearray(size)
+            file.readinto(data)
+        self.bounding_box = (width, height, dx, dy)
+        self.glyphs = {}
+        for i in range(count):
+            code_point, width, height, dx, dy, shift_x, offset = \
+                struct.unpack_from(RECORD, table, i * RECORD_SIZE)
+            bitmap = displayio.Bitmap(max(width, 1), max(height, 1), 2)
+            stride = (width + 7) // 8
+            for y in range(height):
+                row = offset + y * stride
+                for x in range(width):
+                    if data[row + (x >> 3)] & (0x80 >> (x & 7)):
+                        bitmap[x, y] = 1
+            self.glyphs[code_point] = Glyph(bitmap, 0, width, height, dx, dy,
+                                            shift_x, 0)
+
+    def get_bounding_box(self):
+        return self.bounding_box
+
+    def get_glyph(self, code_point):
+        return self.glyphs.get(code_point)
+
+    def load_glyphs(self, code_points):
+        pass # Everything in the file was loaded up front
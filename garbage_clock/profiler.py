@@ -0,0 +1,142 @@
+"""
+Phase profiler for the GARBAGE CLOCK's main loop. Each lap() charges the
+time since the previous one to a phase, in fixed-size log2 histograms kept
+in arrays allocated up front, so it can be left on in production builds.
+Disabled, lap() returns straight away without reading the clock.
+
+On the board lap() reads supervisor.ticks_ms() (CircuitPython 7 and up) or
+time.monotonic() (CircuitPython 6, whose floats aren't heap objects) rather
+than time.monotonic_ns(), whose long ints would be allocated on every lap;
+laps there are only as fine as those clocks, a millisecond at best. Under
+CPython it uses time.monotonic_ns(). Laps are capped at MAX_LAP_US (a
+night's sleep counts as that long) so that no number lap() handles gets
+past the board's small int range.
+"""
+
+import array
+import sys
+import time
+
+MAX_LAP_US = 1000000000 # 1000s; plus spare_us stays under 2**30
+
+# ticks_ms() is milliseconds since boot, wrapping at 2**29 (every 6 days)
+# as supervisor.ticks_ms() does, without allocating on the board
+try:
+    from supervisor import ticks_ms as now_ticks # CircuitPython 7 and up
+    ticks_ms = now_ticks
+
+    def elapsed_us(now, last):
+        # ticks_ms wraps at 2**29; cap in ms before it's made microseconds
+        return min((now - last) & 0x1FFFFFFF, MAX_LAP_US // 1000) * 1000
+except ImportError:
+    if sys.implementation.name == 'circuitpython':
+        now_ticks = time.monotonic
+
+        def ticks_ms():
+            return int(time.monotonic() % 536870.912 * 1000)
+
+        def elapsed_us(now, last):
+            return int(min(now - last, MAX_LAP_US / 1000000) * 1000000)
+    else: # CPython
+        def now_ticks():
+            return time.monotonic_ns()
+
+        def ticks_ms():
+            return time.monotonic_ns() // 1000000 & 0x1FFFFFFF
+
+        def elapsed_us(now, last):
+            return min((now - last) // 1000, MAX_LAP_US)
+
+# Phases of the main loop, in the order they usually run
+SYNC = 0     # Time server sync, including any failure
+CLASSIFY = 1 # Working out the schedule state
+BITMAP = 2   # Loading and swapping the garbage can image
+LAYOUT = 3   # Formatting, updating and placing text
+REFRESH = 4  # Pushing the frame to the display
+COLLECT = 5  # Garbage collection
+SLEEP = 6    # Waiting for the next tick
+PHASE_NAMES = ('sync', 'classify', 'bitmap', 'layout', 'refresh', 'gc',
+               'sleep')
+
+BUCKETS = 16   # Bucket i counts laps under FIRST_US << i, the last the rest
+FIRST_US = 125 # So 0.125ms, 0.25ms ... 2048ms, then 2048ms and up
+
+
+class Profiler:
+    """ Times the phases of the main loop. Call mark() to start timing,
+        then lap(phase) as each phase finishes; phases that don't run in an
+        iteration just aren't lapped. Keeps per phase a histogram, the
+        total (whole seconds and the microseconds over, so both stay small
+        ints on the board for decades) and the longest lap (microseconds).
+        summary() prints it all.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        phases = len(PHASE_NAMES)
+        self.histogram = array.array('L', [0] * (phases * BUCKETS))
+        self.total_s = array.array('L', [0] * phases)
+        self.spare_us = array.array('L', [0] * phases)
+        self.max_us = array.array('L', [0] * phases)
+        self.last = now_ticks() if enabled else 0
+
+    def mark(self):
+        """ Start timing from now without charging anything. """
+        if self.enabled:
+            self.last = now_ticks()
+
+    def lap(self, phase):
+        """ Charge the time since the last mark() or lap() to phase. """
+        if not self.enabled:
+            return
+        now = now_ticks()
+        elapsed = elapsed_us(now, self.last)
+        self.last = now
+        bucket = 0
+        limit = FIRST_US
+        while elapsed >= limit and bucket < BUCKETS - 1:
+            bucket += 1
+            limit <<= 1
+        self.histogram[phase * BUCKETS + bucket] += 1
+        if elapsed > self.max_us[phase]:
+            self.max_us[phase] = elapsed
+        elapsed += self.spare_us[phase]
+        self.total_s[phase] += elapsed // 1000000
+        self.spare_us[phase] = elapsed % 1000000
+
+    def count(self, phase):
+        """ Number of laps charged to phase. """
+        start = phase * BUCKETS
+        return sum(self.histogram[start:start + BUCKETS])
+
+    def reset(self):
+        """ Forget everything recorded so far. """
+        for i in range(len(self.histogram)):
+            self.histogram[i] = 0
+        for i in range(len(PHASE_NAMES)):
+            self.total_s[i] = 0
+            self.spare_us[i] = 0
+            self.max_us[i] = 0
+
+    def summary(self):
+        """ Print count, mean and max per phase, then the non-empty
+            histogram buckets as upper bound in ms: laps.
+        """
+        print('phase      count   mean ms    max ms  histogram')
+        for phase in range(len(PHASE_NAMES)):
+            count = self.count(phase)
+            if not count:
+                continue
+            buckets = []
+            for i in range(BUCKETS):
+                laps = self.histogram[phase * BUCKETS + i]
+                if not laps:
+                    continue
+                if i < BUCKETS - 1:
+                    buckets.append('<%g:%d' % ((FIRST_US << i) / 1000, laps))
+                else:
+                    buckets.append('more:%d' % laps)
+            print('%-8s %7d %9.3f %9.3f  %s' % (
+                PHASE_NAMES[phase], count,
+                (self.total_s[phase] * 1000 + self.spare_us[phase] / 1000) /
+                count,
+                self.max_us[phase] / 1000, ' '.join(buckets)))
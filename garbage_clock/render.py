@@ -0,0 +1,296 @@
+"""
+Drawing the GARBAGE CLOCK face with displayio: the garbage can images,
+outlined text, and a renderer that only repaints what changed.
+"""
+
+import struct
+import displayio
+from .profiler import BITMAP, LAYOUT, REFRESH
+
+
+class FrameRenderer:
+    """ Draws each frame into group, touching only the elements whose
+        inputs changed since the last frame, and refreshes the display only
+        when something visible changed. refreshes and skipped count how
+        many frames did and didn't need a repaint. Image swaps, text layout
+        and refreshes are lapped on profiler as they happen. Night mode
+        changes are logged at debug level if log (a RingLog) is given.
+    """
+    def __init__(self, display, group, night_group, can_cache, layout,
+                 profiler, log=None):
+        self.display = display
+        self.group = group
+        self.night_group = night_group
+        self.can_cache = can_cache
+        self.layout = layout
+        self.profiler = profiler
+        self.log = log
+        self.drawn = {}   # element name -> inputs it was last drawn with
+        self.dirty = False
+        self.swaps = 0    # Times the garbage can image was replaced
+        self.refreshes = 0
+        self.skipped = 0
+
+    def changed(self, name, a, b=None, c=None):
+        """ Record the inputs a, b, c of element name; True if they differ
+            from before. Kept in a list updated in place (no allocation).
+        """
+        last = self.drawn.get(name)
+        if last is None:
+            self.drawn[name] = [a, b, c]
+        elif last[0] == a and last[1] == b and last[2] == c:
+            return False
+        else:
+            last[0], last[1], last[2] = a, b, c
+        self.dirty = True
+        return True
+
+    def draw(self, night, time_text, time_color, date_text, weekday,
+             garbage, color, hcolor):
+        """ Bring the display up to date with the given frame state. Pass
+            the same string objects for unchanged text (see TextFormatter)
+            and an unchanged frame allocates nothing.
+        """
+        self.dirty = False
+        group = self.group
+        if self.changed('night', night):
+            self.display.show(self.night_group if night else group)
+            if self.log:
+                self.log.debug('night mode %s', 'on' if night else 'off')
+        if not night:
+            layout = self.layout
+            rotation = self.display.rotation
+
+            # Trash can image (group[0])
+            if self.changed('can', color, rotation):
+                bitmap, shader = self.can_cache.get(color)
+                tile_grid = displayio.TileGrid(bitmap, pixel_shader=shader)
+                tile_grid.x, tile_grid.y = layout.place('can')
+                group[0] = tile_grid
+                self.swaps += 1
+                self.profiler.lap(BITMAP)
+
+            # Outlined text over the image (group[1])
+            if self.changed('garbage', garbage, hcolor, rotation):
+                group[1].text = garbage
+                group[1].color = hcolor
+                group[1].x, group[1].y = layout.place('garbage', group[1].font,
+                                                      garbage)
+
+            # Time (group[2])
+            if self.changed('time', time_text, time_color, rotation):
+                group[2].text = time_text
+                group[2].color = time_color
+                group[2].x, group[2].y = layout.place('time', group[2].font,
+                                                      time_text)
+
+            # Date (group[3])
+            if self.changed('date', date_text, rotation):
+                group[3].text = date_text
+                group[3].x, group[3].y = layout.place('date', group[3].font,
+                                                      date_text)
+
+            # Day of week (group[4]) in color matching trash color
+            if self.changed('weekday', weekday, hcolor, rotation):
+                group[4].text = weekday
+                group[4].color = hcolor
+                group[4].x, group[4].y = layout.place('weekday', group[4].font,
+                                                      group[4].text)
+        self.profiler.lap(LAYOUT)
+
+        if self.dirty:
+            self.display.refresh()
+            self.refreshes += 1
+            self.profiler.lap(REFRESH)
+        else:
+            self.skipped += 1
+
+
+class OutlinedText(displayio.Group):
+    """ Text with a 1 pixel black outline, drawn straight into one shared
+        3-color bitmap (transparent, outline, fill) in a single pass instead
+        of stacking five labels. Positioned like a Label: x is the left edge
+        and y the vertical middle of the text. width is the canvas size in
+        pixels; text beyond it is clipped.
+    """
+    def __init__(self, font, width, color=0xFFFFFF, text=''):
+        super().__init__(max_size=1)
+        self.font = font
+        _, height, _, font_dy = font.get_bounding_box()
+        self.ascent = height + font_dy
+        self.canvas = displayio.Bitmap(width + 2, height + 2, 3)
+        self.palette = displayio.Palette(3)
+        self.palette.make_transparent(0)
+        self.palette[1] = 0x000000
+        self.palette[2] = color
+        self.append(displayio.TileGrid(self.canvas, pixel_shader=self.palette,
+                                       x=-1, y=self.ascent // 2 - self.ascent - 1))
+        self._text = None
+        self._width = 0
+        self.text = text
+
+    @property
+    def color(self):
+        return self.palette[2]
+
+    @color.setter
+    def color(self, value):
+        self.palette[2] = value
+
+    @property
+    def bounding_box(self):
+        return (0, self.ascent // 2 - self.ascent, self._width,
+                self.canvas.height - 2)
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        if value == self._text:
+            return
+        self._text = value
+        canvas = self.canvas
+        canvas.fill(0)
+        max_x = canvas.width - 1
+        max_y = canvas.height - 1
+        baseline = self.ascent + 1
+        pen_x = right = 0
+        for char in value:
+            glyph = self.font.get_glyph(ord(char))
+            if not glyph:
+                continue
+            left = pen_x + glyph.dx + 1
+            top = baseline - glyph.height - glyph.dy
+            for gy in range(glyph.height):
+                y = top + gy
+                if y < 1 or y >= max_y:
+                    continue
+                for gx in range(glyph.width):
+                    x = left + gx
+                    if x < 1 or x >= max_x or not glyph.bitmap[gx, gy]:
+                        continue
+                    # Fill pixel, plus outline on any empty neighbor
+                    canvas[x, y] = 2
+                    if canvas[x, y - 1] != 2:
+                        canvas[x, y - 1] = 1
+                    if canvas[x, y + 1] != 2:
+                        canvas[x, y + 1] = 1
+                    if canvas[x - 1, y] != 2:
+                        canvas[x - 1, y] = 1
+                    if canvas[x + 1, y] != 2:
+                        canvas[x + 1, y] = 1
+            right = max(right, pen_x + glyph.shift_x,
+                        pen_x + glyph.dx + glyph.width)
+            pen_x += glyph.shift_x
+        self._width = right
+
+
+class BitmapCache:
+    """ Loads each garbage can image at most once, keyed by color name.
+        Images that fit in the RAM budget are decoded into a palette-indexed
+        displayio.Bitmap (the cans use only a couple of colors, so each one
+        is a few hundred bytes). Anything else stays an OnDiskBitmap with
+        its file kept open for reuse. When a new image would push the cache
+        over budget, the least recently used RAM images are evicted.
+    """
+    def __init__(self, path_format, budget):
+        self.path_format = path_format
+        self.budget = budget
+        self.used = 0     # RAM bytes held by decoded images
+        self.entries = {} # key -> [bitmap, pixel_shader, ram_bytes, file]
+        self.order = []   # keys, least recently used first
+        self.loads = 0
+
+    def get(self, key):
+        """ Return (bitmap, pixel_shader) for key, loading it if needed. """
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self._load(key)
+            self.entries[key] = entry
+            self.loads += 1
+        else:
+            self.order.remove(key)
+        self.order.append(key)
+        return entry[0], entry[1]
+
+    def _load(self, key):
+        file = open(self.path_format.format(key), 'rb')
+        info = scan_bmp(file)
+        if info:
+            cost = indexed_bitmap_bytes(info[0], info[1], len(info[4]))
+            if cost <= self.budget:
+                self._evict(cost)
+                bitmap, palette = decode_bmp(file, info)
+                file.close()
+                self.used += cost
+                return [bitmap, palette, cost, None]
+        return [displayio.OnDiskBitmap(file), displayio.ColorConverter(), 0, file]
+
+    def _evict(self, cost):
+        for key in self.order[:]:
+            if self.used + cost <= self.budget:
+                break
+            entry = self.entries[key]
+            if entry[2]: # Only RAM images count against the budget
+                self.used -= entry[2]
+                del self.entries[key]
+                self.order.remove(key)
+
+
+def scan_bmp(file, max_colors=256):
+    """ Read the header and distinct colors of an uncompressed 24-bit BMP.
+        Returns (width, height, data_offset, row_stride, colors) where colors
+        maps 0xRRGGBB -> palette index, or None if the file can't be indexed.
+    """
+    header = file.read(54)
+    offset, = struct.unpack_from('<I', header, 10)
+    width, height = struct.unpack_from('<ii', header, 18)
+    depth, compression = struct.unpack_from('<HI', header, 28)
+    if header[0:2] != b'BM' or depth != 24 or compression != 0:
+        return None
+    stride = (width * 3 + 3) & ~3
+    row = bytearray(stride)
+    colors = {}
+    file.seek(offset)
+    for _ in range(abs(height)):
+        file.readinto(row)
+        for x in range(0, width * 3, 3):
+            rgb = (row[x + 2] << 16) | (row[x + 1] << 8) | row[x]
+            if rgb not in colors:
+                if len(colors) == max_colors:
+                    return None
+                colors[rgb] = len(colors)
+    return width, height, offset, stride, colors
+
+
+def indexed_bitmap_bytes(width, height, num_colors):
+    """ Approximate RAM used by a displayio.Bitmap plus Palette holding
+        num_colors (bitmaps store 1, 2, 4, 8... bits per pixel, rows padded
+        to 32 bits).
+    """
+    bits = 1
+    while (1 << bits) < num_colors:
+        bits *= 2
+    return (width * bits + 31) // 32 * 4 * height + num_colors * 4
+
+
+def decode_bmp(file, info):
+    """ Decode a BMP previously checked by scan_bmp() into an indexed
+        displayio.Bitmap and Palette.
+    """
+    width, height, offset, stride, colors = info
+    bitmap = displayio.Bitmap(width, abs(height), max(2, len(colors)))
+    palette = displayio.Palette(len(colors))
+    for rgb, index in colors.items():
+        palette[index] = rgb
+    row = bytearray(stride)
+    file.seek(offset)
+    for i in range(abs(height)):
+        file.readinto(row)
+        y = abs(height) - 1 - i if height > 0 else i # BMPs are bottom-up
+        for x in range(width):
+            bitmap[x, y] = colors[(row[x * 3 + 2] << 16) |
+                                  (row[x * 3 + 1] << 8) | row[x * 3]]
+    return bitmap, palette
@@ -0,0 +1,110 @@
+"""
+Leveled logging for the GARBAGE CLOCK into a fixed-size ring buffer, so a
+unit with no serial console attached isn't printing (or formatting) text
+nobody reads. Messages are kept until drain() prints them; when the buffer
+fills the oldest are overwritten.
+
+To make disabled log calls free, each module that logs declares its level
+and the levels it uses as micropython.const and guards every call with the
+level divided by the message's level, e.g.
+
+    LOG_LEVEL = const(1)
+    INFO = const(2)
+    ...
+    if LOG_LEVEL // INFO:
+        LOG.info('synced in %d ms', ms)
+
+The compiler folds LOG_LEVEL // INFO to 0 and drops the whole statement,
+arguments and all. (It doesn't fold comparisons, hence the division.)
+Kept free of any board specific imports so it also runs under CPython.
+"""
+
+import time
+
+try:
+    from micropython import const
+except ImportError: # CPython
+    def const(value):
+        return value
+
+OFF = const(0)
+ERROR = const(1)
+INFO = const(2)
+DEBUG = const(3)
+LEVEL_TAGS = ('', 'E', 'I', 'D')
+
+NEWLINE = 0x0A
+
+
+class RingLog:
+    """ Log messages, each a line stamped with time.monotonic() seconds and
+        its level, in a bytearray of size bytes allocated once. If echo is
+        set messages are printed as they come in as well. lost counts
+        messages overwritten before they were drained.
+    """
+    def __init__(self, size, echo=False):
+        self.buffer = bytearray(size)
+        self.echo = echo
+        self.head = 0 # Where the next byte goes
+        self.used = 0 # Bytes held, ending at head
+        self.lost = 0
+        self.partial = False # Oldest message kept lost its beginning
+
+    def error(self, fmt, *args):
+        self.write(ERROR, fmt % args if args else fmt)
+
+    def info(self, fmt, *args):
+        self.write(INFO, fmt % args if args else fmt)
+
+    def debug(self, fmt, *args):
+        self.write(DEBUG, fmt % args if args else fmt)
+
+    def write(self, level, message):
+        """ Add one already formatted message at level. """
+        line = '%.3f %s %s\n' % (time.monotonic(), LEVEL_TAGS[level], message)
+        if self.echo:
+            print(line, end='')
+        data = line.encode()
+        buffer = self.buffer
+        size = len(buffer)
+        if not size:
+            return
+        if len(data) > size: # Keep the end of a message bigger than the log
+            data = data[len(data) - size:]
+        count = len(data)
+        free = size - self.used
+        if count > free: # Overwrite the oldest messages
+            start = (self.head - self.used) % size
+            for i in range(count - free):
+                if buffer[(start + i) % size] == NEWLINE:
+                    self.lost += 1
+            # Does the oldest byte kept start a message?
+            self.partial = buffer[(start + count - free - 1) % size] != NEWLINE
+        head = self.head
+        first = min(count, size - head)
+        buffer[head:head + first] = data[:first]
+        if first < count: # Wrap around
+            buffer[:count - first] = data[first:]
+        self.head = (head + count) % size
+        self.used = min(self.used + count, size)
+
+    def drain(self):
+        """ Print everything logged since the last drain() and empty the
+            log. A message partly overwritten is dropped.
+        """
+        buffer = self.buffer
+        used = self.used
+        start = (self.head - used) % len(buffer) if used else 0
+        if start + used <= len(buffer):
+            data = bytes(buffer[start:start + used])
+        else:
+            data = bytes(buffer[start:]) + bytes(buffer[:self.head])
+        if self.partial:
+            data = data[data.find(b'\n') + 1:]
+            self.lost += 1
+        if self.lost:
+            print('(%d messages lost)' % self.lost)
+        print(data.decode(), end='')
+        self.used = 0
+        self.lost = 0
+        self.partial = False
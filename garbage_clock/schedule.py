@@ -0,0 +1,64 @@
+"""
+Garbage pickup schedule for the GARBAGE CLOCK: which state (days to go,
+can color) is in effect at any minute of the week, and when it next
+changes. Weekday 0 is Sunday, as in AdafruitIO's wday.
+"""
+
+import array
+
+WEEKDAY_NAMES = ("SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT")
+MINUTES_PER_WEEK = 7 * 24 * 60
+
+
+class ScheduleTable:
+    """ Pickup rules compiled once into sorted week-minute start points and
+        a matching tuple of (weekday, garbage, color, hcolor) states, so
+        classifying a time is a short binary search that returns an
+        existing tuple (no allocation). Weekday 0 is Sunday.
+    """
+    def __init__(self, rules):
+        rules = sorted(rules)
+        self.starts = array.array('H', [(r[0] * 24 + r[1]) * 60 + r[2]
+                                        for r in rules])
+        self.states = tuple((WEEKDAY_NAMES[r[0]], r[3], r[4], r[5])
+                            for r in rules)
+
+    def _search(self, wday, hour, minute):
+        """ Number of states starting at or before the given time. """
+        week_minute = (wday * 24 + hour) * 60 + minute
+        starts = self.starts
+        low, high = 0, len(starts)
+        while low < high:
+            mid = (low + high) // 2
+            if starts[mid] <= week_minute:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def index(self, wday, hour, minute):
+        """ Index of the state in effect at the given time, 0 to
+            len(states) - 1. Before the first start it's last week's state.
+        """
+        return (self._search(wday, hour, minute) - 1) % len(self.starts)
+
+    def classify(self, wday, hour, minute):
+        """ Return (weekday, garbage, color, hcolor) in effect at a time. """
+        return self.states[self.index(wday, hour, minute)]
+
+    def minutes_to_next(self, wday, hour, minute):
+        """ Minutes from the given time until the next state starts. """
+        starts = self.starts
+        i = self._search(wday, hour, minute)
+        if i < len(starts):
+            next_start = starts[i]
+        else:
+            next_start = starts[0] + MINUTES_PER_WEEK
+        return next_start - (wday * 24 + hour) * 60 - minute
+
+
+def is_night(hour, start, end):
+    """ True if the display should be blank at the given hour, for a night
+        from hour start until hour end.
+    """
+    return hour >= start or hour < end
@@ -0,0 +1,269 @@
+"""
+Time keeping for the GARBAGE CLOCK between time server syncs: when to wake
+up, how far the RTC drifts and how to trim it, when to retry a failed sync,
+the checkpoint that carries synced time across a reboot, and setting the
+RTC from the time sources.
+"""
+
+import random
+import struct
+import time
+from .aio_time import fetch_first
+from .schedule import is_night
+
+
+def sync_rtc(sources, rtc, drift=None, log=None):
+    """ Set rtc (an rtc.RTC) from the first of sources (time sources, see
+        aio_time.fetch_first()) that answers, and return that local time
+        as a time.struct_time, whose tm_wday counts from Sunday as the
+        sources' wday does. The RTC's error against it is recorded on drift
+        (a DriftEstimator) if given, and the time logged at debug level if
+        log (a RingLog) is given. Exceptions from the sources are NOT
+        CAUGHT HERE: callers handle a failed sync their own way (e.g.
+        reschedule for later).
+    """
+    fields = fetch_first(sources)
+    time_struct = time.struct_time(*fields)
+    if log:
+        log.debug('time %d-%02d-%02d %02d:%02d:%02d wday %d', fields[0],
+                  fields[1], fields[2], fields[3], fields[4], fields[5],
+                  fields[6])
+    if drift:
+        drift.record(time.time(), time.mktime(time_struct))
+    rtc.datetime = time_struct
+    return time_struct
+
+
+def next_hour(now, localnow, hour):
+    """ RTC epoch second the next time the clock strikes hour (o'clock),
+        after now (time.time(), localnow being time.localtime()).
+    """
+    return now - localnow.tm_sec + ((hour * 60 - localnow.tm_hour * 60 -
+                                     localnow.tm_min) % 1440 or 1440) * 60
+
+
+class TickScheduler:
+    """ Decides how long the main loop can sleep and sleeps exactly that
+        long. The next deadline is the next minute boundary (nothing visible
+        changes in between), schedule transition, night-mode edge or time
+        sync, whichever is first; at night (from hour night_start to
+        night_end) only the night edge and sync count, since nothing is
+        shown. Deadlines are RTC epoch seconds. The sub-second phase of the
+        RTC tick is learned against time.monotonic_ns() so wakeups land just
+        after the second rolls over rather than up to a second late.
+    """
+    EARLY_NS = 20000000 # Wake this far ahead of the estimated tick, then nap
+    NAP = 0.005         # Seconds per nap while waiting for the tick
+
+    def __init__(self, night_start, night_end):
+        self.night_start = night_start
+        self.night_end = night_end
+        self.tick_sec = None # An RTC second observed to start...
+        self.tick_ns = 0     # ...at this monotonic_ns() time
+        self.wakeups = 0
+
+    def reset(self):
+        """ Forget the learned RTC phase (call after the RTC is set). """
+        self.tick_sec = None
+
+    def next_deadline(self, now, localnow, sync_due, schedule=None):
+        """ RTC epoch second to wake at, given now (time.time()), localnow
+            (time.localtime()), when the next sync is due and optionally the
+            ScheduleTable whose transitions should wake us.
+        """
+        minute_start = now - localnow.tm_sec
+        hour, minute = localnow.tm_hour, localnow.tm_min
+        night = is_night(hour, self.night_start, self.night_end)
+        deadline = min(sync_due, next_hour(
+            now, localnow, self.night_end if night else self.night_start))
+        if not night:
+            deadline = min(deadline, minute_start + 60)
+            if schedule:
+                deadline = min(deadline, minute_start + 60 *
+                               schedule.minutes_to_next((localnow.tm_wday + 1) % 7,
+                                                        hour, minute))
+        return deadline
+
+    def morning(self, now, localnow):
+        """ RTC epoch second the night next ends, given now (time.time())
+            and localnow (time.localtime()). Syncing then catches a daylight
+            saving change, which happens at night, before it's shown.
+        """
+        return next_hour(now, localnow, self.night_end)
+
+    def sleep_until(self, target):
+        """ Sleep until the RTC reads target (epoch seconds). """
+        if self.tick_sec is not None:
+            remaining = (self.tick_ns + (target - self.tick_sec) * 1000000000
+                         - self.EARLY_NS - time.monotonic_ns())
+            if remaining > 0:
+                time.sleep(remaining / 1000000000)
+        elif target - time.time() > 1:
+            time.sleep(target - time.time() - 1)
+        # Nap until the RTC second actually ticks over
+        napped = False
+        while time.time() < target:
+            time.sleep(self.NAP)
+            napped = True
+        if napped: # Saw the tick happen, so this is a good phase reference
+            self.tick_sec = target
+            self.tick_ns = time.monotonic_ns()
+        else:      # Woke late, phase estimate has drifted; learn it again
+            self.tick_sec = None
+        self.wakeups += 1
+
+
+class DriftEstimator:
+    """ Measures how far the RTC wanders between time server syncs and uses
+        it two ways: the drift rate trims the RTC calibration (roughly 1 ppm
+        per step, positive speeds the clock up), and the sync interval
+        doubles while the RTC stays well within bound seconds of the
+        server and halves when it strays outside. Offsets are only whole
+        seconds, so the rate is only trusted once the offset reaches 2s.
+        Server time is local, so a daylight saving change shows up as a
+        whole number of hours (STEP) on top of the drift; that part is
+        left out, and so is any rate beyond MAX_PPM, which no crystal
+        drifts by (the RTC was set some other way in between).
+    """
+    STEP = 3600   # Clock changes move local time by whole hours
+    MAX_PPM = 500 # Well past any crystal's drift and the calibration range
+
+    def __init__(self, bound, min_interval, max_interval):
+        self.bound = bound
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.offset = 0       # RTC minus server seconds at the last sync,
+                              # less any clock change
+        self.rate_ppm = 0     # Last significant drift measured, + = fast
+        self.calibration = 0  # Current RTC calibration setting
+        self.last_set = None  # Server time the RTC was last set to
+
+    def record(self, rtc_now, server_now):
+        """ Note the RTC and server time (epoch seconds) at a sync, just
+            before the RTC is set. Returns the new sync interval.
+        """
+        offset = rtc_now - server_now
+        step = (offset + self.STEP // 2) // self.STEP * self.STEP
+        offset -= step # What's left is drift
+        if self.last_set is not None:
+            elapsed = server_now + step - self.last_set
+            if abs(offset) >= 2 and elapsed > 0:
+                rate_ppm = offset * 1000000 // elapsed
+                if abs(rate_ppm) <= self.MAX_PPM:
+                    self.rate_ppm = rate_ppm
+                    self.set_calibration(self.calibration - rate_ppm)
+            if abs(offset) > self.bound:
+                self.interval = max(self.min_interval, self.interval // 2)
+            elif abs(offset) * 2 <= self.bound:
+                self.interval = min(self.max_interval, self.interval * 2)
+        self.offset = offset
+        self.last_set = server_now
+        return self.interval
+
+    def set_calibration(self, value):
+        """ Apply an RTC calibration value, clamped to the SAMD51 range. """
+        self.calibration = max(-127, min(127, value))
+        try:
+            from rtc import RTC
+            RTC().calibration = self.calibration
+        except (ImportError, AttributeError, NotImplementedError, ValueError):
+            pass # Not supported on this board, interval still adapts
+
+
+class SyncRetryPolicy:
+    """ Decides when to try again after a failed time sync. Retries back
+        off exponentially from base seconds up to cap, with random jitter so
+        a fleet of clocks doesn't retry in lockstep after an outage. After
+        trips failures in a row the circuit breaker opens: the clock holds
+        on RTC time and probes the server only every open_time seconds until
+        a sync succeeds. state, failures and last_delay can be read at any
+        time to see what it is doing.
+    """
+    CLOSED = 'closed'   # Syncing normally
+    BACKOFF = 'backoff' # Retrying after failures
+    OPEN = 'open'       # Given up for now, running on RTC time
+
+    def __init__(self, base, cap, trips, open_time):
+        self.base = base
+        self.cap = cap
+        self.trips = trips
+        self.open_time = open_time
+        self.state = self.CLOSED
+        self.failures = 0       # In a row
+        self.total_failures = 0 # Since boot
+        self.last_delay = 0
+
+    def succeeded(self):
+        """ Note a successful sync, closing the breaker. """
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def failed(self):
+        """ Note a failed sync. Returns seconds to wait before retrying. """
+        self.failures += 1
+        self.total_failures += 1
+        if self.failures >= self.trips:
+            self.state = self.OPEN
+            delay = self.open_time
+        else:
+            self.state = self.BACKOFF
+            delay = min(self.cap, self.base << (self.failures - 1))
+        # Half fixed, half random keeps some spacing between retries
+        self.last_delay = delay // 2 + random.randint(0, delay // 2)
+        return self.last_delay
+
+
+class Checkpoint:
+    """ The last synced time, drift estimate and schedule state, kept as a
+        small binary record in non-volatile memory so that after a reboot a
+        real frame can go up before WiFi connects. To spare the flash it is
+        rewritten only when the drift estimate changed or the saved time is
+        more than interval seconds old. nvm is microcontroller.nvm (None on
+        boards without it, which makes this a no-op).
+    """
+    # magic, synced epoch, drift ppm, calibration, sync interval,
+    # schedule state index, checksum
+    FORMAT = '<4sIibIBH'
+    MAGIC = b'GCK1'
+
+    def __init__(self, nvm, interval):
+        self.nvm = nvm
+        self.interval = interval
+        self.size = struct.calcsize(self.FORMAT)
+        self.saved = None # Fields of the record in NVM
+
+    def load(self, states):
+        """ Return (epoch, rate_ppm, calibration, sync_interval, index) from
+            NVM, or None if there is no valid record or its index isn't one
+            of states schedule states (the SCHEDULE was changed).
+        """
+        if self.nvm is None or len(self.nvm) < self.size:
+            return None
+        record = bytes(self.nvm[0:self.size])
+        fields = struct.unpack(self.FORMAT, record)
+        if fields[0] != self.MAGIC or fields[-1] != sum(record[:-2]) & 0xFFFF:
+            return None
+        if not 0 <= fields[5] < states:
+            return None
+        self.saved = fields[1:-1]
+        return self.saved
+
+    def save(self, epoch, drift, index):
+        """ Record a sync at epoch with its DriftEstimator and schedule
+            state index, if it's due. Returns True if NVM was written.
+        """
+        if self.nvm is None:
+            return False
+        fields = (epoch, drift.rate_ppm, drift.calibration, drift.interval,
+                  index)
+        if (self.saved and self.saved[1:] == fields[1:] and
+                epoch - self.saved[0] < self.interval):
+            return False
+        record = bytearray(struct.pack(self.FORMAT, self.MAGIC, epoch,
+                                       drift.rate_ppm, drift.calibration,
+                                       drift.interval, index, 0))
+        struct.pack_into('<H', record, self.size - 2, sum(record[:-2]) & 0xFFFF)
+        self.nvm[0:self.size] = record
+        self.saved = fields
+        return True
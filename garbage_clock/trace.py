@@ -0,0 +1,108 @@
+"""
+Main loop trace for the GARBAGE CLOCK: one fixed-size binary record per
+loop iteration, kept in a ring buffer allocated once, so the last few hours
+of a clock in the field can be dumped over serial and replayed on a
+computer (replayTrace.py runs them through the simulator).
+Kept free of any board specific imports so it also runs under CPython.
+"""
+
+import binascii
+import struct
+from .profiler import ticks_ms
+
+try:
+    from micropython import const
+except ImportError: # CPython
+    def const(value):
+        return value
+
+# ticks_ms() (wraps after 6 days), RTC epoch seconds, sync latency ms,
+# flags, schedule state index (-1 unknown), free heap bytes
+RECORD = '<IIHBbI'
+RECORD_SIZE = const(16)
+VERSION = const(1)
+
+# Flags
+SYNC_OK = const(1)     # Time server sync succeeded this iteration
+SYNC_FAILED = const(2) # Sync attempted and failed
+REFRESHED = const(4)   # Display was refreshed
+
+
+class TraceRecorder:
+    """ The last records main loop iterations, RECORD_SIZE bytes each.
+        total counts every record() since boot, including overwritten ones.
+    """
+    def __init__(self, records):
+        self.buffer = bytearray(records * RECORD_SIZE)
+        self.records = records
+        self.head = 0  # Where the next record goes
+        self.count = 0 # Records held, ending at head
+        self.total = 0
+
+    def record(self, rtc_time, flags, latency_ms, state, mem_free):
+        """ Add one iteration's record, time stamped now. """
+        if not self.records:
+            return
+        struct.pack_into(RECORD, self.buffer, self.head * RECORD_SIZE,
+                         ticks_ms(),
+                         rtc_time & 0xFFFFFFFF, min(latency_ms, 0xFFFF),
+                         flags, state, mem_free)
+        self.head = (self.head + 1) % self.records
+        self.count = min(self.count + 1, self.records)
+        self.total += 1
+
+    def export(self):
+        """ The records held, oldest first, as bytes. """
+        start = (self.head - self.count) % self.records if self.count else 0
+        end = start + self.count
+        if end <= self.records:
+            return bytes(self.buffer[start * RECORD_SIZE:end * RECORD_SIZE])
+        return (bytes(self.buffer[start * RECORD_SIZE:]) +
+                bytes(self.buffer[:self.head * RECORD_SIZE]))
+
+    def dump(self):
+        """ Print the records held, oldest first, one per line in hex
+            between 'trace' header and end lines (see load_text()).
+        """
+        print('trace %d %d %d %d' % (VERSION, RECORD_SIZE, self.count,
+                                     self.total))
+        buffer = memoryview(self.buffer)
+        start = (self.head - self.count) % self.records if self.count else 0
+        for i in range(self.count):
+            offset = (start + i) % self.records * RECORD_SIZE
+            print(binascii.hexlify(buffer[offset:offset + RECORD_SIZE])
+                  .decode())
+        print('trace end')
+
+
+def load(data):
+    """ List of record tuples (see RECORD) from exported bytes. """
+    return [struct.unpack_from(RECORD, data, offset)
+            for offset in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE)]
+
+
+def load_text(lines):
+    """ Exported bytes from dump() output, e.g. a serial console capture;
+        other lines around it are skipped. If there are several dumps the
+        last one is used.
+    """
+    data = None
+    reading = False
+    for line in lines:
+        line = line.strip()
+        if line.startswith('trace '):
+            fields = line.split()
+            reading = fields[1] != 'end'
+            if not reading:
+                continue
+            if int(fields[1]) != VERSION or int(fields[2]) != RECORD_SIZE:
+                raise ValueError('unknown trace version ' + line)
+            data = bytearray()
+        elif reading and len(line) == RECORD_SIZE * 2:
+            try:
+                data += binascii.unhexlify(line)
+            except ValueError:
+                pass # Serial noise, skip the record
+    if data is None:
+        raise ValueError('no trace found')
+    return bytes(data)
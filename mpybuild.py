@@ -0,0 +1,48 @@
+"""
+Compile the garbage_clock package to .mpy bytecode with mpy-cross. Runs
+under CPython on your computer; copy the output folder to /lib on the
+Matrix Portal. mpy-cross must match the board's CircuitPython version
+(download it from the CircuitPython site, or pip install a matching
+mpy-cross release).
+
+    python3 mpybuild.py [--mpy-cross PATH] [--output build/garbage_clock]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+PACKAGE = 'garbage_clock'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--mpy-cross', default='mpy-cross',
+                        help='mpy-cross executable (default from PATH)')
+    parser.add_argument('--output', default=os.path.join('build', PACKAGE),
+                        help='folder to write the .mpy files to')
+    args = parser.parse_args()
+
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)), PACKAGE)
+    os.makedirs(args.output, exist_ok=True)
+    source_bytes = mpy_bytes = 0
+    for name in sorted(os.listdir(source)):
+        if not name.endswith('.py'):
+            continue
+        path = os.path.join(source, name)
+        output = os.path.join(args.output, name[:-3] + '.mpy')
+        try:
+            subprocess.run([args.mpy_cross, '-o', output, path], check=True)
+        except (OSError, subprocess.CalledProcessError) as error:
+            print('%s: %s' % (name, error), file=sys.stderr)
+            sys.exit(1)
+        source_bytes += os.path.getsize(path)
+        mpy_bytes += os.path.getsize(output)
+        print('%-16s %6d -> %6d bytes' % (name, os.path.getsize(path),
+                                          os.path.getsize(output)))
+    print('%-16s %6d -> %6d bytes' % ('total', source_bytes, mpy_bytes))
+
+
+if __name__ == '__main__':
+    main()
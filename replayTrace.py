@@ -0,0 +1,132 @@
+"""
+Replay a main loop trace from a clock in the field through the clock's
+code in the simulator (see simulator/), so timing problems seen on a
+real clock can be reproduced and benchmarked on a computer.
+
+Get the trace by typing t at the clock's serial console with the output
+captured to a file, e.g. with screen's -L option, then run
+
+    python3 replayTrace.py screenlog.0 [--drift-ppm 20] [--save replay.txt]
+
+The simulated clock boots at the trace's first RTC time and its time
+server answers each sync the way the recorded ones went (success or
+failure, after the recorded latency). It runs as long as the trace covers
+and records its own trace. Both are summarized side by side, with any
+change of schedule state that doesn't match, and the host time per
+iteration. --save writes the replayed trace in the same format, for
+diffing or replaying again. The trace only holds the last TRACE_RECORDS
+iterations, so a replay of a trace that doesn't start at boot starts from
+an unsynced clock, and its first iterations can differ.
+"""
+
+import argparse
+import contextlib
+from garbage_clock.trace import load, load_text, SYNC_OK, SYNC_FAILED, \
+    REFRESHED
+from simulator import Simulator
+
+MONOTONIC_WRAP = 1 << 29 # Trace's ticks_ms() milliseconds wrap here
+
+
+def read_trace(path):
+    """ Records from a capture of the t command's output, or from a file
+        of exported bytes.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if data.startswith(b'trace ') or b'\ntrace ' in data:
+        data = load_text(data.decode('utf-8', 'replace').splitlines())
+    return unwrap(load(data))
+
+
+def unwrap(records):
+    """ records with their monotonic milliseconds counted on past each
+        wrap, so they keep increasing.
+    """
+    unwrapped = []
+    wraps = 0
+    for record in records:
+        if unwrapped and record[0] + wraps < unwrapped[-1][0]:
+            wraps += MONOTONIC_WRAP
+        unwrapped.append((record[0] + wraps,) + record[1:])
+    return unwrapped
+
+
+def summary(records):
+    """ Totals for a list of records, by name. """
+    syncs = [r for r in records if r[3] & (SYNC_OK | SYNC_FAILED)]
+    latencies = sorted(r[2] for r in syncs) or [0]
+    return {
+        'iterations': len(records),
+        'seconds': (records[-1][0] - records[0][0]) / 1000 if records else 0,
+        'syncs': len(syncs),
+        'failed syncs': len([r for r in syncs if r[3] & SYNC_FAILED]),
+        'median sync ms': latencies[len(latencies) // 2],
+        'max sync ms': latencies[-1],
+        'refreshes': len([r for r in records if r[3] & REFRESHED]),
+        'state changes': len(changes(records)),
+        'min free heap': min(r[5] for r in records) if records else 0,
+    }
+
+
+def changes(records):
+    """ (RTC time, state) for each change of schedule state. """
+    result = []
+    for record in records:
+        if not result or record[4] != result[-1][1]:
+            result.append((record[1], record[4]))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('trace', help='serial capture or exported trace')
+    parser.add_argument('--drift-ppm', type=float, default=0,
+                        help='how fast the simulated RTC runs')
+    parser.add_argument('--render', action='store_true',
+                        help='paint every refresh into the framebuffer')
+    parser.add_argument('--save', help='write the replayed trace here')
+    args = parser.parse_args()
+
+    recorded = read_trace(args.trace)
+    if not recorded:
+        parser.error('the trace is empty')
+    first = recorded[0]
+    script = [(bool(r[3] & SYNC_OK), r[2] / 1000) for r in recorded
+              if r[3] & (SYNC_OK | SYNC_FAILED)]
+    sim = Simulator(start=first[1] - first[0] / 1000,
+                    drift_ppm=args.drift_ppm, script=script,
+                    settings={'TRACE_RECORDS': 2 * len(recorded) + 16},
+                    render=args.render)
+    sim.run(seconds=recorded[-1][0] / 1000 + 1) # Through the last record
+    trace = sim.namespace['TRACE']
+    replayed = unwrap(load(trace.export()))
+    if args.save:
+        with open(args.save, 'w') as file:
+            with contextlib.redirect_stdout(file):
+                trace.dump()
+
+    recorded_summary = summary(recorded)
+    replayed_summary = summary(replayed)
+    print('%-16s %10s %10s' % ('', 'recorded', 'replayed'))
+    for name, value in recorded_summary.items():
+        row = '%-16s %10d %10d' if isinstance(value, int) else \
+            '%-16s %10.1f %10.1f'
+        print(row % (name, value, replayed_summary[name]))
+    mismatches = 0
+    for was, now in zip(changes(recorded), changes(replayed)):
+        if was != now:
+            print('state %d at %d was %d at %d' % (now[1], now[0], was[1],
+                                                   was[0]))
+            mismatches += 1
+    print('%d state changes differ' % mismatches)
+
+    host = sorted(sim.iteration_ns)
+    if host:
+        print('host us per iteration: median %.1f, p95 %.1f, max %.1f' % (
+            host[len(host) // 2] / 1000, host[len(host) * 95 // 100] / 1000,
+            host[-1] / 1000))
+
+
+if __name__ == '__main__':
+    main()
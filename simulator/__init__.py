@@ -0,0 +1,13 @@
+"""
+Headless simulator of the GARBAGE CLOCK for CPython: stand-ins for the
+Matrix Portal's modules (a framebuffer display, an RTC and time module on
+a virtual clock, a still accelerometer, a scripted time server) under
+which the clock's code.py runs unmodified, as fast as the host allows.
+See benchClock.py for a benchmark built on it.
+
+    from simulator import Simulator
+    sim = Simulator(start=1609459200, utc_offset=-5).run(iterations=100)
+    sim.display.save_ppm('frame.ppm')
+"""
+
+from .core import Simulator, StopSimulation
@@ -0,0 +1,267 @@
+"""
+Runs the clock's code.py, unmodified, under CPython with the stand-ins in
+this package in place of the board's modules.
+"""
+
+import builtins
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+import types
+import weakref
+from . import display, hardware, network, vclock
+
+# Board modules code.py and garbage_clock import, replaced while running
+STAND_INS = ('time', 'gc', 'board', 'busio', 'displayio', 'fontio', 'rtc',
+             'microcontroller', 'supervisor', 'micropython', 'secrets',
+             'adafruit_matrixportal', 'adafruit_matrixportal.network',
+             'adafruit_matrixportal.matrix', 'adafruit_display_text',
+             'adafruit_display_text.label', 'adafruit_bitmap_font',
+             'adafruit_bitmap_font.bitmap_font', 'adafruit_lis3dh',
+             'adafruit_requests', 'digitalio', 'adafruit_debouncer')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StopSimulation(BaseException):
+    """ Raised at a loop iteration to end the run (BaseException so the
+        clock's own exception handling doesn't catch it).
+    """
+
+
+def module(name, **attributes):
+    stand_in = types.ModuleType(name)
+    stand_in.__dict__.update(attributes)
+    return stand_in
+
+
+def apply_settings(source, settings):
+    """ code.py source with CONFIGURABLE SETTINGS lines changed, as if
+        edited by hand: settings maps a name to its new value.
+    """
+    for name, value in settings.items():
+        source, count = re.subn(r'^%s\s*=.*?(?=\s*#|$)' % name,
+                                '%s = %r' % (name, value), source, count=1,
+                                flags=re.M)
+        if not count:
+            raise KeyError('no setting ' + name)
+    return source
+
+
+class Simulator:
+    """ One simulated Matrix Portal running code (the clock's code.py, by
+        default garbageClockAIO.py) from drive, the folder standing in for
+        CIRCUITPY (default: this repository, which has the bmps folder;
+        fonts not found there are replaced by display.block_font()).
+
+        Time starts at start (UTC epoch seconds, default now) on a
+        VirtualClock whose RTC runs drift_ppm fast. The time server is a
+        network.TimeServer for utc_offset and dst with the given latency
+        and outages, or following script. secrets, settings (see
+        apply_settings()), display rotation, whether to render frames and
+        the simulated heap size can be chosen; seed makes random (sync
+        jitter, demo) repeatable.
+
+        Each run() boots the clock and returns after some loop iterations
+        or some virtual time. NVM and the RTC carry over from one run to
+        the next unless power_lost, as through a reset. Per iteration it
+        keeps the host time taken in iteration_ns and, when tracemalloc is
+        tracing, the peak bytes allocated in iteration_bytes (boot time is
+        in boot_ns). open_files() counts files left open.
+        on_iteration(simulator) is called at the top of each iteration,
+        with the clock's globals in namespace.
+    """
+    def __init__(self, code='garbageClockAIO.py', drive=ROOT, start=None,
+                 drift_ppm=0, utc_offset=0, dst=None, latency=0.2,
+                 outages=(), script=(), secrets=None, settings=None,
+                 rotation=0, render=True, heap_size=1 << 20, seed=0):
+        self.code = os.path.join(drive, code)
+        self.drive = drive
+        self.clock = vclock.VirtualClock(time.time() if start is None
+                                         else start, drift_ppm)
+        self.server = network.TimeServer(self.clock, utc_offset, dst, latency,
+                                         outages, script)
+        self.secrets = {'ssid': 'simulated', 'password': 'simulated',
+                        'aio_username': 'simulated', 'aio_key': 'simulated',
+                        'utc_offset': utc_offset, 'dst': dst}
+        self.secrets.update(secrets or {})
+        self.settings = settings or {}
+        self.rotation = rotation
+        self.render = render
+        self.heap = hardware.Heap(heap_size)
+        self.serial = hardware.Serial(self._poll)
+        self.nvm = bytearray(256) # Survives reboots, like the real thing
+        self.files = weakref.WeakSet() # Every file the clock has opened
+        self.seed = seed
+        self.display = None
+        self.namespace = None
+        self.iteration = 0
+        self.iteration_ns = []
+        self.iteration_bytes = []
+        self.boot_ns = 0
+        self.on_iteration = None
+        self._stop_iteration = None
+        self._stop_time = None
+        self._mark_ns = 0
+
+    def modules(self):
+        """ The stand-in modules, by name. """
+        clock = self.clock
+        time_module = vclock.TimeModule(clock)
+        matrix = module('adafruit_matrixportal.matrix', Matrix=self._matrix)
+        net = module('adafruit_matrixportal.network',
+                     Network=lambda **kwargs: network.Network(self.server,
+                                                              **kwargs))
+        label = module('adafruit_display_text.label', Label=display.Label)
+        bitmap_font = module(
+            'adafruit_bitmap_font.bitmap_font',
+            load_font=lambda path: display.load_font(path, self.resolve))
+        heap = self.heap
+        return {
+            'time': module('time', **{name: getattr(time_module, name) for
+                                      name in ('time', 'monotonic',
+                                               'monotonic_ns', 'sleep',
+                                               'localtime', 'mktime',
+                                               'struct_time')}),
+            'gc': module('gc', collect=heap.collect, mem_alloc=heap.mem_alloc,
+                         mem_free=heap.mem_free, threshold=heap.threshold,
+                         enable=heap.enable, disable=heap.disable,
+                         isenabled=heap.isenabled),
+            'board': module('board', **{pin: pin for pin in hardware.PINS}),
+            'busio': module('busio', I2C=hardware.I2C),
+            'displayio': module('displayio', **{name: getattr(display, name)
+                                                for name in (
+                                                    'Bitmap', 'Palette',
+                                                    'ColorConverter',
+                                                    'OnDiskBitmap',
+                                                    'TileGrid', 'Group')}),
+            'fontio': module('fontio', Glyph=display.Glyph),
+            'rtc': module('rtc', RTC=lambda: vclock.RTC(clock)),
+            'microcontroller': module('microcontroller', nvm=self.nvm),
+            'supervisor': module('supervisor', runtime=self.serial),
+            'micropython': module('micropython', const=lambda value: value),
+            'secrets': module('secrets', secrets=self.secrets),
+            'adafruit_matrixportal': module('adafruit_matrixportal',
+                                            matrix=matrix, network=net),
+            'adafruit_matrixportal.network': net,
+            'adafruit_matrixportal.matrix': matrix,
+            'adafruit_display_text': module('adafruit_display_text',
+                                            label=label),
+            'adafruit_display_text.label': label,
+            'adafruit_bitmap_font': module('adafruit_bitmap_font',
+                                           bitmap_font=bitmap_font),
+            'adafruit_bitmap_font.bitmap_font': bitmap_font,
+            'adafruit_lis3dh': module(
+                'adafruit_lis3dh',
+                LIS3DH_I2C=hardware.Accelerometer(self.rotation)),
+            'adafruit_requests': module('adafruit_requests',
+                                        get=self.server.get),
+            'digitalio': module('digitalio', DigitalInOut=hardware.DigitalInOut,
+                                Pull=hardware.Pull),
+            'adafruit_debouncer': module('adafruit_debouncer',
+                                         Debouncer=hardware.Debouncer),
+        }
+
+    def _matrix(self, **kwargs):
+        matrix = display.Matrix(render=self.render, **kwargs)
+        self.display = matrix.display
+        return matrix
+
+    def resolve(self, path):
+        """ Host path for a path on the board (absolute ones are on the
+            drive).
+        """
+        if path.startswith('/'):
+            return os.path.join(self.drive, path[1:])
+        return path
+
+    def _open(self, path, *args, **kwargs):
+        if isinstance(path, str) and path.startswith('/') and \
+                not os.path.exists(path):
+            path = self.resolve(path)
+        file = self._host_open(path, *args, **kwargs)
+        self.files.add(file)
+        return file
+
+    def open_files(self):
+        """ How many files the clock has opened and not closed (nor let
+            go of, which closes them).
+        """
+        return len([file for file in self.files if not file.closed])
+
+    def _poll(self):
+        """ Top of a main loop iteration (see hardware.Serial). """
+        now_ns = time.perf_counter_ns()
+        if self.iteration:
+            self.iteration_ns.append(now_ns - self._mark_ns)
+            if tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                self.iteration_bytes.append(peak - self._mark_bytes)
+        else:
+            self.boot_ns = now_ns - self._mark_ns
+        if self._stop_iteration is not None and \
+                self.iteration >= self._stop_iteration:
+            raise StopSimulation
+        if self._stop_time is not None and \
+                self.clock.true_time() >= self._stop_time:
+            raise StopSimulation
+        self.iteration += 1
+        if self.on_iteration:
+            self.on_iteration(self)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._mark_bytes = tracemalloc.get_traced_memory()[0]
+        self._mark_ns = time.perf_counter_ns()
+
+    def run(self, iterations=None, seconds=None, on_iteration=None,
+            power_lost=False):
+        """ Boot the clock and run it for iterations main loop iterations
+            or seconds of virtual time, whichever comes first. Returns self.
+        """
+        self.clock.reboot(power_lost)
+        self.iteration = 0
+        self.iteration_ns = []
+        self.iteration_bytes = []
+        self._stop_iteration = iterations
+        self._stop_time = None if seconds is None else \
+            self.clock.true_time() + seconds
+        self.on_iteration = on_iteration
+        with open(self.code) as file:
+            source = apply_settings(file.read(), self.settings)
+        saved = {name: sys.modules.get(name) for name in
+                 list(sys.modules) if name == 'garbage_clock' or
+                 name.startswith('garbage_clock.')}
+        saved.update({name: sys.modules.get(name) for name in STAND_INS})
+        for name in saved:
+            sys.modules.pop(name, None)
+        sys.modules.update(self.modules())
+        sys.path.insert(0, self.drive)
+        self._host_open = builtins.open
+        builtins.open = self._open
+        stdin = sys.stdin
+        sys.stdin = self.serial
+        cwd = os.getcwd()
+        os.chdir(self.drive)
+        random.seed(self.seed)
+        self.heap.start()
+        self.namespace = {'__name__': '__main__', '__file__': self.code}
+        self._mark_ns = time.perf_counter_ns()
+        try:
+            exec(compile(source, self.code, 'exec'), self.namespace)
+        except StopSimulation:
+            pass
+        finally:
+            os.chdir(cwd)
+            sys.stdin = stdin
+            builtins.open = self._host_open
+            sys.path.remove(self.drive)
+            for name in list(sys.modules):
+                if name in STAND_INS or name == 'garbage_clock' or \
+                        name.startswith('garbage_clock.'):
+                    del sys.modules[name]
+            sys.modules.update({name: saved_module for name, saved_module in
+                                saved.items() if saved_module is not None})
+        return self
@@ -0,0 +1,365 @@
+"""
+CPython stand-ins for displayio, fontio, adafruit_display_text.label and
+adafruit_bitmap_font, just enough of each for the GARBAGE CLOCK. The
+display keeps a framebuffer of 0xRRGGBB pixels that refresh() paints from
+the shown group, so frames can be checked or saved as images.
+"""
+
+import array
+import os
+import struct
+from collections import namedtuple
+from fontpack import read_bdf
+
+Glyph = namedtuple('Glyph', ('bitmap', 'tile_index', 'width', 'height', 'dx',
+                             'dy', 'shift_x', 'shift_y'))
+
+
+class Bitmap:
+    """ displayio.Bitmap: width x height values below value_count. """
+    def __init__(self, width, height, value_count):
+        self.width = width
+        self.height = height
+        self.value_count = value_count
+        self.data = array.array('L', [0]) * (width * height)
+
+    def _index(self, index):
+        if isinstance(index, tuple):
+            x, y = index
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                raise IndexError('pixel out of bounds')
+            return y * self.width + x
+        return index
+
+    def __getitem__(self, index):
+        return self.data[self._index(index)]
+
+    def __setitem__(self, index, value):
+        if not 0 <= value < self.value_count:
+            raise ValueError('value out of range')
+        self.data[self._index(index)] = value
+
+    def fill(self, value):
+        for i in range(len(self.data)):
+            self.data[i] = value
+
+
+class Palette:
+    """ displayio.Palette of color_count 0xRRGGBB colors. """
+    def __init__(self, color_count):
+        self.colors = [0] * color_count
+        self.transparent = set()
+
+    def __len__(self):
+        return len(self.colors)
+
+    def __getitem__(self, index):
+        return self.colors[index]
+
+    def __setitem__(self, index, color):
+        self.colors[index] = color
+
+    def make_transparent(self, index):
+        self.transparent.add(index)
+
+    def make_opaque(self, index):
+        self.transparent.discard(index)
+
+    def is_transparent(self, index):
+        return index in self.transparent
+
+
+class ColorConverter:
+    """ displayio.ColorConverter: pixel values are already 0xRRGGBB. """
+    def convert(self, color):
+        return color
+
+
+class OnDiskBitmap:
+    """ displayio.OnDiskBitmap for uncompressed 24-bit BMP files (all the
+        clock uses). Pixels are read when it's made rather than on every
+        refresh; each is its 0xRRGGBB color. Holds on to file as the real
+        one does, which reads from it on every refresh.
+    """
+    def __init__(self, file):
+        self.file = file
+        file.seek(0)
+        header = file.read(54)
+        offset, = struct.unpack_from('<I', header, 10)
+        width, height = struct.unpack_from('<ii', header, 18)
+        depth, compression = struct.unpack_from('<HI', header, 28)
+        if header[0:2] != b'BM' or depth != 24 or compression != 0:
+            raise ValueError('only uncompressed 24-bit BMPs are simulated')
+        self.width = width
+        self.height = abs(height)
+        self.data = array.array('L', [0]) * (width * self.height)
+        stride = (width * 3 + 3) & ~3
+        file.seek(offset)
+        for i in range(self.height):
+            row = file.read(stride)
+            y = self.height - 1 - i if height > 0 else i # Bottom-up
+            for x in range(width):
+                self.data[y * width + x] = ((row[x * 3 + 2] << 16) |
+                                            (row[x * 3 + 1] << 8) | row[x * 3])
+
+    def __getitem__(self, index):
+        x, y = index
+        return self.data[y * self.width + x]
+
+
+class TileGrid:
+    """ displayio.TileGrid showing one whole bitmap (the only way the clock
+        uses them).
+    """
+    def __init__(self, bitmap, *, pixel_shader, width=1, height=1,
+                 tile_width=None, tile_height=None, default_tile=0, x=0, y=0):
+        self.bitmap = bitmap
+        self.pixel_shader = pixel_shader
+        self.x = x
+        self.y = y
+        self.hidden = False
+
+
+class Group:
+    """ displayio.Group, holding at most max_size layers like CircuitPython
+        6 (appending more raises RuntimeError).
+    """
+    def __init__(self, *, max_size=4, scale=1, x=0, y=0):
+        self.max_size = max_size
+        self.layers = []
+        self.x = x
+        self.y = y
+        self.hidden = False
+
+    def append(self, layer):
+        if len(self.layers) >= self.max_size:
+            raise RuntimeError('Group full')
+        self.layers.append(layer)
+
+    def pop(self, index=-1):
+        return self.layers.pop(index)
+
+    def __len__(self):
+        return len(self.layers)
+
+    def __getitem__(self, index):
+        return self.layers[index]
+
+    def __setitem__(self, index, layer):
+        self.layers[index] = layer
+
+
+class Display:
+    """ A width x height panel. refresh() paints the shown group into
+        framebuffer (logical, i.e. rotated, coordinates) unless render is
+        False, which saves the time in long runs; refreshes counts calls
+        either way.
+    """
+    def __init__(self, width, height, render=True):
+        self.panel_width = width
+        self.panel_height = height
+        self.render = render
+        self.rotation = 0
+        self.auto_refresh = True
+        self.root_group = None
+        self.refreshes = 0
+        self.framebuffer = array.array('L', [0]) * (width * height)
+
+    @property
+    def width(self):
+        if self.rotation in (90, 270):
+            return self.panel_height
+        return self.panel_width
+
+    @property
+    def height(self):
+        if self.rotation in (90, 270):
+            return self.panel_width
+        return self.panel_height
+
+    def show(self, group):
+        self.root_group = group
+
+    def refresh(self, *, target_frames_per_second=60,
+                minimum_frames_per_second=1):
+        self.refreshes += 1
+        if self.render:
+            framebuffer = self.framebuffer
+            for i in range(len(framebuffer)):
+                framebuffer[i] = 0
+            if self.root_group is not None:
+                self._paint(self.root_group, 0, 0)
+        return True
+
+    def _paint(self, layer, x, y):
+        if layer.hidden:
+            return
+        x += layer.x
+        y += layer.y
+        if not isinstance(layer, TileGrid):
+            for child in layer:
+                self._paint(child, x, y)
+            return
+        bitmap = layer.bitmap
+        shader = layer.pixel_shader
+        width, height = self.width, self.height
+        for by in range(bitmap.height):
+            py = y + by
+            if py < 0 or py >= height:
+                continue
+            for bx in range(bitmap.width):
+                px = x + bx
+                if px < 0 or px >= width:
+                    continue
+                value = bitmap[bx, by]
+                if isinstance(shader, Palette):
+                    if shader.is_transparent(value):
+                        continue
+                    value = shader[value]
+                self.framebuffer[py * width + px] = value
+
+    def pixel(self, x, y):
+        """ 0xRRGGBB at (x, y) as of the last refresh. """
+        return self.framebuffer[y * self.width + x]
+
+    def save_ppm(self, path, scale=8):
+        """ Write the framebuffer as a binary PPM image, each pixel scale
+            pixels square.
+        """
+        width, height = self.width, self.height
+        rows = []
+        for y in range(height):
+            row = bytearray()
+            for x in range(width):
+                color = self.pixel(x, y)
+                row += bytes(((color >> 16) & 0xFF, (color >> 8) & 0xFF,
+                              color & 0xFF)) * scale
+            rows.append(bytes(row) * scale)
+        with open(path, 'wb') as file:
+            file.write(b'P6 %d %d 255\n' % (width * scale, height * scale))
+            file.write(b''.join(rows))
+
+
+class Matrix:
+    """ adafruit_matrixportal.matrix.Matrix: a 64x32 display. """
+    def __init__(self, *, width=64, height=32, bit_depth=2, render=True,
+                 **kwargs):
+        self.display = Display(width, height, render)
+
+
+class Label(Group):
+    """ adafruit_display_text.label.Label, drawn like the CircuitPython 6
+        version: x is the left edge of the text and y its vertical middle.
+    """
+    def __init__(self, font, *, text='', color=0xFFFFFF, x=0, y=0,
+                 max_glyphs=None, **kwargs):
+        super().__init__(max_size=1, x=x, y=y)
+        self.font = font
+        _, height, _, font_dy = font.get_bounding_box()
+        self.ascent = height + font_dy
+        self.height = height
+        self.palette = Palette(2)
+        self.palette.make_transparent(0)
+        self.palette[1] = color
+        self._text = None
+        self._width = 0
+        self.text = text
+
+    @property
+    def color(self):
+        return self.palette[1]
+
+    @color.setter
+    def color(self, value):
+        self.palette[1] = value
+
+    @property
+    def bounding_box(self):
+        return (0, self.ascent // 2 - self.ascent, self._width, self.height)
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        if value == self._text:
+            return
+        self._text = value
+        glyphs = [self.font.get_glyph(ord(char)) for char in value]
+        pen_x = right = 0
+        for glyph in glyphs:
+            if glyph:
+                right = max(right, pen_x + glyph.dx + glyph.width)
+                pen_x += glyph.shift_x
+        self._width = max(right, pen_x)
+        # A new bitmap per text change, as the real label allocates
+        canvas = Bitmap(max(self._width, 1), self.height, 2)
+        pen_x = 0
+        for glyph in glyphs:
+            if not glyph:
+                continue
+            top = self.ascent - glyph.height - glyph.dy
+            for gy in range(glyph.height):
+                for gx in range(glyph.width):
+                    x, y = pen_x + glyph.dx + gx, top + gy
+                    if (glyph.bitmap[gx, gy] and 0 <= x < canvas.width and
+                            0 <= y < canvas.height):
+                        canvas[x, y] = 1
+            pen_x += glyph.shift_x
+        tile_grid = TileGrid(canvas, pixel_shader=self.palette,
+                             y=self.ascent // 2 - self.ascent)
+        if self.layers:
+            self.layers[0] = tile_grid
+        else:
+            self.append(tile_grid)
+
+
+class Font:
+    """ A bitmap font as adafruit_bitmap_font returns it, from a bounding
+        box (width, height, dx, dy) and glyphs as read by fontpack.read_bdf().
+    """
+    def __init__(self, bounding_box, glyphs):
+        self.bounding_box = bounding_box
+        self.glyphs = {}
+        for code_point, (width, height, dx, dy, shift_x, rows) in \
+                glyphs.items():
+            bitmap = Bitmap(max(width, 1), max(height, 1), 2)
+            for y, row in enumerate(rows):
+                for x in range(width):
+                    if row[x >> 3] & (0x80 >> (x & 7)):
+                        bitmap[x, y] = 1
+            self.glyphs[code_point] = Glyph(bitmap, 0, width, height, dx, dy,
+                                            shift_x, 0)
+
+    def get_bounding_box(self):
+        return self.bounding_box
+
+    def get_glyph(self, code_point):
+        return self.glyphs.get(code_point)
+
+    def load_glyphs(self, code_points):
+        pass
+
+
+def block_font():
+    """ A stand-in for fonts that aren't on the simulated drive: every
+        printable ASCII character is a 5x7 box on a 6 pixel advance, so
+        text lays out to a realistic size.
+    """
+    box = [b'\xf8'] + [b'\x88'] * 5 + [b'\xf8']
+    glyphs = {32: (0, 0, 0, 0, 4, [])}
+    for code_point in range(33, 127):
+        glyphs[code_point] = (5, 7, 0, 0, 6, box)
+    return Font((6, 10, 0, -2), glyphs)
+
+
+def load_font(path, resolve=None):
+    """ adafruit_bitmap_font.bitmap_font.load_font(): a BDF font from the
+        simulated drive, or block_font() if there's no such file. resolve
+        maps a board path to a host path.
+    """
+    host_path = resolve(path) if resolve else path
+    if not os.path.exists(host_path):
+        return block_font()
+    return Font(*read_bdf(host_path))
@@ -0,0 +1,136 @@
+"""
+CPython stand-ins for the rest of the Matrix Portal the clock touches:
+board pins, I2C, the LIS3DH accelerometer, buttons, the serial console and
+the gc module's heap figures.
+"""
+
+import gc as host_gc
+import math
+import tracemalloc
+from collections import namedtuple
+
+PINS = ('SCL', 'SDA', 'NEOPIXEL', 'BUTTON_UP', 'BUTTON_DOWN')
+
+Acceleration = namedtuple('Acceleration', ('x', 'y', 'z'))
+
+
+class I2C:
+    """ busio.I2C """
+    def __init__(self, scl, sda, **kwargs):
+        self.scl = scl
+        self.sda = sda
+
+
+class Accelerometer:
+    """ adafruit_lis3dh.LIS3DH_I2C held still with the display at rotation
+        (0, 90, 180 or 270 degrees): gravity is pointed so that the clock's
+        rotation formula comes out at that angle.
+    """
+    def __init__(self, rotation=0):
+        angle = math.radians(rotation) - math.pi / 2
+        self.acceleration = Acceleration(-9.8 * math.cos(angle),
+                                         -9.8 * math.sin(angle), 0.0)
+
+    def __call__(self, i2c, address=0x18):
+        return self # Constructed like the real class
+
+
+class Pull:
+    """ digitalio.Pull """
+    UP = 'up'
+    DOWN = 'down'
+
+
+class DigitalInOut:
+    """ digitalio.DigitalInOut for a button that is never pressed. """
+    def __init__(self, pin):
+        self.pin = pin
+        self.value = True
+
+    def switch_to_input(self, pull=None):
+        self.value = pull != Pull.DOWN
+
+
+class Debouncer:
+    """ adafruit_debouncer.Debouncer """
+    def __init__(self, io):
+        self.io = io
+        self.value = io.value
+        self.fell = self.rose = False
+
+    def update(self):
+        value = self.io.value
+        self.fell = self.value and not value
+        self.rose = value and not self.value
+        self.value = value
+
+
+class Serial:
+    """ The USB serial console: characters typed with type() are read one
+        at a time through sys.stdin. on_poll is called every time the clock
+        checks supervisor.runtime.serial_bytes_available, which it does
+        once at the top of every main loop iteration.
+    """
+    def __init__(self, on_poll=None):
+        self.pending = ''
+        self.on_poll = on_poll
+
+    def type(self, chars):
+        self.pending += chars
+
+    @property
+    def serial_bytes_available(self):
+        if self.on_poll:
+            self.on_poll()
+        return len(self.pending)
+
+    def read(self, count=1):
+        chars, self.pending = self.pending[:count], self.pending[count:]
+        return chars
+
+
+class Heap:
+    """ The gc module, with mem_alloc() and mem_free() figured from
+        tracemalloc (when it's tracing) against a heap of size bytes.
+        CPython objects are bigger than MicroPython's, so give it a few
+        times the board's heap; the point is the trend, not the numbers.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.base = 0
+        self.collections = 0
+        self.amount = None
+
+    def start(self):
+        """ Count allocations from now on. """
+        self.base = tracemalloc.get_traced_memory()[0]
+
+    def mem_alloc(self):
+        if not tracemalloc.is_tracing():
+            return 0
+        return max(0, tracemalloc.get_traced_memory()[0] - self.base)
+
+    def mem_free(self):
+        return max(0, self.size - self.mem_alloc())
+
+    def collect(self):
+        self.collections += 1
+        host_gc.collect()
+
+    def threshold(self, amount=None):
+        if amount is None:
+            return -1 if self.amount is None else self.amount
+        self.amount = amount
+        return None
+
+    @staticmethod
+    def enable():
+        pass
+
+    @staticmethod
+    def disable():
+        pass
+
+    @staticmethod
+    def isenabled():
+        return True
@@ -0,0 +1,90 @@
+"""
+Scripted network for the simulator: a time server that answers like
+AdafruitIO's time struct integration and the WiFi chip's NTP time, from
+the simulation's true time, with a fixed latency and scripted outages.
+"""
+
+from garbage_clock.aio_time import NtpTimeSource
+
+
+class Response:
+    """ Enough of an adafruit_requests response for TimeClient. """
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    def close(self):
+        pass
+
+
+class TimeServer:
+    """ Answers time requests from clock's true time, converted to local
+        time with utc_offset (hours) and an optional DST rule ('us' or
+        'eu'), like a server in the clock's timezone. Each request takes
+        latency seconds of virtual time. During any of outages, (start,
+        end) true UTC epoch seconds, requests fail after their timeout.
+        Alternatively script, a sequence of (succeeds, latency seconds),
+        decides how each request goes, in order, until it runs out (as
+        when replaying a trace). requests, failures and bytes count what
+        the clock asked for.
+    """
+    def __init__(self, clock, utc_offset=0, dst=None, latency=0.2,
+                 outages=(), script=()):
+        self.clock = clock
+        self.latency = latency
+        self.outages = list(outages)
+        self.script = list(script)
+        self.local = NtpTimeSource(lambda: int(clock.true_time()),
+                                   utc_offset, dst)
+        self.requests = 0
+        self.failures = 0
+        self.bytes = 0
+
+    def down(self):
+        now = self.clock.true_time()
+        for start, end in self.outages:
+            if start <= now < end:
+                return True
+        return False
+
+    def _request(self, timeout):
+        self.requests += 1
+        if self.requests <= len(self.script):
+            succeeds, latency = self.script[self.requests - 1]
+            self.clock.advance(latency * 1000000000)
+            if not succeeds:
+                self.failures += 1
+                raise RuntimeError('Failed to request hostname')
+            return
+        if self.down():
+            self.failures += 1
+            self.clock.advance(timeout * 1000000000)
+            raise RuntimeError('Failed to request hostname')
+        self.clock.advance(self.latency * 1000000000)
+
+    def get(self, url, headers=None, timeout=10):
+        """ adafruit_requests.get() for the time struct URL. """
+        self._request(timeout)
+        body = ('{"year":%d,"mon":%d,"mday":%d,"hour":%d,"min":%d,'
+                '"sec":%d,"wday":%d,"yday":%d,"isdst":%d}' %
+                tuple(self.local.fetch())).encode()
+        self.bytes += len(body)
+        return Response(200, body)
+
+    def get_time(self):
+        """ The ESP32's get_time(): (UTC epoch seconds, 0). """
+        self._request(1)
+        return (int(self.clock.true_time()), 0)
+
+
+class Network:
+    """ adafruit_matrixportal.network.Network, whose ESP32 gets its time
+        from server.
+    """
+    def __init__(self, server, **kwargs):
+        self._wifi = self
+        self.esp = server
+        self.connected = False
+
+    def connect(self):
+        self.connected = True
@@ -0,0 +1,122 @@
+"""
+Virtual time for the simulator: stand-ins for CircuitPython's time module
+and rtc.RTC that read a VirtualClock instead of the host clock. Sleeping
+just moves the clock forward, so a simulated day takes as long as the
+clock's code takes to run through it.
+"""
+
+import calendar
+import time as host_time
+
+BOARD_EPOCH = 946684800 # 2000-01-01, where a board's RTC starts at power up
+
+
+class VirtualClock:
+    """ true_ns is real UTC time in nanoseconds, what time servers go by.
+        monotonic_ns() counts from boot. The RTC counts local time from
+        whatever it was last set to, running drift_ppm fast plus its
+        calibration (positive speeds it up, roughly 1 ppm per step, as on
+        the SAMD51).
+    """
+    def __init__(self, start, drift_ppm=0):
+        self.true_ns = int(start * 1000000000)
+        self.boot_ns = self.true_ns
+        self.drift_ppm = drift_ppm
+        self.calibration = 0
+        self.rtc_base_ns = BOARD_EPOCH * 1000000000 # RTC reading...
+        self.rtc_set_ns = self.true_ns              # ...as of this true time
+
+    def true_time(self):
+        """ Real UTC epoch seconds, as a float. """
+        return self.true_ns / 1000000000
+
+    def advance(self, ns):
+        self.true_ns += int(ns)
+
+    def monotonic_ns(self):
+        return self.true_ns - self.boot_ns
+
+    def rtc_ns(self):
+        elapsed = self.true_ns - self.rtc_set_ns
+        return (self.rtc_base_ns + elapsed +
+                int(elapsed * (self.drift_ppm + self.calibration) // 1000000))
+
+    def set_rtc(self, seconds):
+        self.rtc_base_ns = int(seconds) * 1000000000
+        self.rtc_set_ns = self.true_ns
+
+    def set_calibration(self, value):
+        self.rtc_base_ns = self.rtc_ns() # Time so far ran at the old rate
+        self.rtc_set_ns = self.true_ns
+        self.calibration = value
+
+    def reboot(self, power_lost=False):
+        """ Start monotonic time over; a power loss also resets the RTC. """
+        self.boot_ns = self.true_ns
+        if power_lost:
+            self.set_rtc(BOARD_EPOCH)
+
+
+class TimeModule:
+    """ CircuitPython's time module on a VirtualClock. time() and
+        localtime() read the RTC, which holds local time; there's no
+        timezone and no gmtime(), as on the board.
+    """
+    def __init__(self, clock):
+        self.clock = clock
+
+    def time(self):
+        return self.clock.rtc_ns() // 1000000000
+
+    def monotonic(self):
+        return self.clock.monotonic_ns() / 1000000000
+
+    def monotonic_ns(self):
+        return self.clock.monotonic_ns()
+
+    def sleep(self, seconds):
+        if seconds < 0:
+            raise ValueError('sleep length must be non-negative')
+        self.clock.advance(seconds * 1000000000)
+
+    def localtime(self, seconds=None):
+        if seconds is None:
+            seconds = self.time()
+        return host_time.gmtime(seconds)
+
+    @staticmethod
+    def mktime(time_struct):
+        return calendar.timegm(tuple(time_struct)[:9])
+
+    @staticmethod
+    def struct_time(*fields):
+        """ Takes the nine fields as arguments (CircuitPython) or as one
+            sequence (CPython).
+        """
+        if len(fields) == 1:
+            fields = fields[0]
+        return host_time.struct_time(tuple(fields))
+
+
+class RTC:
+    """ rtc.RTC: datetime and calibration, on a VirtualClock. """
+    def __init__(self, clock):
+        self.clock = clock
+
+    @property
+    def datetime(self):
+        return host_time.gmtime(self.clock.rtc_ns() // 1000000000)
+
+    @datetime.setter
+    def datetime(self, value):
+        self.clock.set_rtc(calendar.timegm(tuple(value)[:9]))
+
+    @property
+    def calibration(self):
+        return self.clock.calibration
+
+    @calibration.setter
+    def calibration(self, value):
+        if not -127 <= value <= 127:
+            raise ValueError('calibration out of range')
+        self.clock.set_calibration(value)
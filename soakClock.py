@@ -0,0 +1,213 @@
+"""
+Soak test: run the clock for a simulated year (or --days) in the simulator
+(see simulator/), at thousands of times real speed, through daylight saving
+changes and time server outages. Once a simulated day it samples open
+files, heap in use, live objects and the median host time per loop
+iteration, and at the end fits a line through each, leaving out the
+warm-up days. A slope that adds up to more than the metric's tolerance
+over the run is a leak or creep, and the test fails (exit status 1). It
+also fails if the time on any frame shown is more than FACE_ERROR off
+the time server's (clocks changing for daylight saving included), except
+during an outage and for OUTAGE_GRACE after it.
+
+    python3 soakClock.py [--days 365] [--start '2021-01-01 09:00']
+        [--utc-offset -5] [--dst us] [--outages 30] [--set NAME=VALUE ...]
+        [--code code.py]
+
+The heap and objects are CPython's, which are bigger than the board's; it's
+their trend that matters. Iteration time on a busy computer is noisy, hence
+its loose tolerance.
+"""
+
+import argparse
+import array
+import ast
+import calendar
+import gc as host_gc
+import random
+import sys
+import time
+import tracemalloc
+from simulator import Simulator
+
+DAY = 86400
+WARMUP_DAYS = 7 # Every state, so every can image, has been shown by then
+FACE_ERROR = 120    # Seconds the time shown may be off (it changes a minute)
+OUTAGE_GRACE = 7200 # Seconds after an outage to catch up (RETRY_OPEN and some)
+
+# Growth over the run that fails the test: more than absolute, or more
+# than relative times the mean (0 for either leaves that check out)
+TOLERANCES = (
+    ('open files', 0.5, 0),
+    ('heap bytes', 4096, 0.05),
+    ('objects', 200, 0.02),
+    ('median us', 0, 0.5),
+)
+
+
+def outage_windows(start, days, count, seed):
+    """ count outages of ten minutes to two days, at random times over the
+        run (seeded, so every run is the same).
+    """
+    rand = random.Random(seed)
+    windows = []
+    for _ in range(count):
+        begin = start + rand.uniform(WARMUP_DAYS * DAY, days * DAY)
+        windows.append((begin, begin + rand.choice((600, 3600, 6 * 3600,
+                                                     DAY, 2 * DAY))))
+    return sorted(windows)
+
+
+def slope(values):
+    """ Least squares slope of values against their index. """
+    count = len(values)
+    mean_x = (count - 1) / 2
+    mean_y = sum(values) / count
+    spread = sum((x - mean_x) ** 2 for x in range(count))
+    if not spread:
+        return 0
+    return sum((x - mean_x) * (y - mean_y)
+               for x, y in enumerate(values)) / spread
+
+
+class FaceCheck:
+    """ on_iteration callback that compares the time on the frame shown
+        with the time server's local time, counting wrong frames and the
+        worst error in seconds (see FACE_ERROR and OUTAGE_GRACE).
+    """
+    def __init__(self):
+        self.refreshes = 0
+        self.shown = None # RTC epoch seconds of the time on the frame shown
+        self.wrong = 0
+        self.worst = 0
+
+    def __call__(self, sim):
+        namespace = sim.namespace
+        if sim.display.refreshes != self.refreshes: # Last iteration drew
+            self.refreshes = sim.display.refreshes
+            self.shown = calendar.timegm(tuple(namespace['LOCALNOW']))
+        if self.shown is None or \
+                sim.display.root_group is not namespace.get('GROUP'):
+            return # Nothing or the night's blank screen is showing
+        now = sim.clock.true_time()
+        if any(start <= now < end + OUTAGE_GRACE
+               for start, end in sim.server.outages):
+            return
+        error = abs(calendar.timegm(tuple(sim.server.local.fetch()[:6]) +
+                                    (0, 0, 0)) - self.shown)
+        self.worst = max(self.worst, error)
+        if error > FACE_ERROR:
+            self.wrong += 1
+
+
+class Sampler:
+    """ on_iteration callback that samples the metrics (see TOLERANCES)
+        once a day for up to days days. Samples go in arrays allocated up
+        front, so keeping them doesn't grow the heap being measured.
+    """
+    def __init__(self, start, days):
+        self.next_day = start + DAY
+        self.days = 0
+        self.samples = [array.array('d', [0]) * days for _ in TOLERANCES]
+        self.host_start = time.perf_counter()
+
+    def __call__(self, sim):
+        if sim.clock.true_time() < self.next_day or \
+                self.days == len(self.samples[0]):
+            return
+        self.next_day += DAY
+        self.days += 1
+        latencies = sorted(sim.iteration_ns)
+        sim.iteration_ns = [] # Don't let the simulator's lists grow
+        sim.iteration_bytes = []
+        host_gc.collect()
+        sample = (sim.open_files(), tracemalloc.get_traced_memory()[0],
+                  len(host_gc.get_objects()),
+                  latencies[len(latencies) // 2] / 1000 if latencies else 0)
+        for column, value in enumerate(sample):
+            self.samples[column][self.days - 1] = value
+        if self.days % 30 == 0:
+            print('day %3d: %d files, %d heap bytes, %d objects, %.1f us, '
+                  '%d syncs (%d failed), %.0fx real time' % (
+                      (self.days,) + sample + (
+                          sim.server.requests, sim.server.failures,
+                          self.days * DAY /
+                          (time.perf_counter() - self.host_start))))
+            sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--days', type=int, default=365,
+                        help='simulated days to run (default 365)')
+    parser.add_argument('--start', default='2021-01-01 09:00',
+                        help='local date and time to start at (when a day '
+                        "starts matters to when syncs fall, so not midnight)")
+    parser.add_argument('--utc-offset', type=float, default=-5,
+                        help='timezone offset from UTC in hours')
+    parser.add_argument('--dst', default='us', help="'us', 'eu' or 'none'")
+    parser.add_argument('--outages', type=int, default=30,
+                        help='time server outages over the run')
+    parser.add_argument('--drift-ppm', type=float, default=30,
+                        help='how fast the simulated RTC runs')
+    parser.add_argument('--set', action='append', default=[],
+                        metavar='NAME=VALUE',
+                        help='change a setting in code.py, e.g. TIME_SOURCE="ntp"')
+    parser.add_argument('--code', default='garbageClockAIO.py',
+                        help='version of the clock to run')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    settings = {}
+    for setting in args.set:
+        name, _, value = setting.partition('=')
+        settings[name] = ast.literal_eval(value)
+
+    start = (calendar.timegm(time.strptime(args.start, '%Y-%m-%d %H:%M')) -
+             int(args.utc_offset * 3600))
+    dst = None if args.dst == 'none' else args.dst
+    sim = Simulator(code=args.code, start=start, drift_ppm=args.drift_ppm,
+                    utc_offset=args.utc_offset, dst=dst,
+                    outages=outage_windows(start, args.days, args.outages,
+                                           args.seed),
+                    settings=settings, render=False, heap_size=64 << 20,
+                    seed=args.seed)
+    sampler = Sampler(start, args.days)
+    face = FaceCheck()
+
+    def on_iteration(sim):
+        face(sim)
+        sampler(sim)
+    tracemalloc.start()
+    try:
+        # A day over, so the last day's sample is taken by an iteration at
+        # or after its end (at night the clock can sleep for hours)
+        sim.run(seconds=(args.days + 1) * DAY, on_iteration=on_iteration)
+    finally:
+        tracemalloc.stop()
+
+    if sampler.days - WARMUP_DAYS < 3:
+        print('too short to see a trend; run for more days')
+        sys.exit(1)
+    print('\n%d days, %d syncs (%d failed), %d display refreshes' % (
+        sampler.days, sim.server.requests, sim.server.failures,
+        sim.display.refreshes))
+    print('%-12s %12s %12s %12s  %s' % ('', 'first', 'last', 'trend', ''))
+    failed = False
+    for column, (name, absolute, relative) in enumerate(TOLERANCES):
+        values = sampler.samples[column][WARMUP_DAYS:sampler.days]
+        growth = slope(values) * (len(values) - 1)
+        creeping = ((absolute and growth > absolute) or
+                    (relative and growth > relative * sum(values) / len(values)))
+        failed = failed or creeping
+        print('%-12s %12.1f %12.1f %+12.1f  %s' % (
+            name, values[0], values[-1], growth,
+            'FAIL' if creeping else 'ok'))
+    print('%d frames showed the wrong time, off by up to %d s  %s' % (
+        face.wrong, face.worst, 'FAIL' if face.wrong else 'ok'))
+    failed = failed or face.wrong
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()